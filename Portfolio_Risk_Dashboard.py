@@ -15,6 +15,7 @@ import pandas as pd
 import numpy as np
 import json
 from datetime import datetime
+import traceback
 
 # Import all core SATID calculation functions from shared module
 from SATID_core_calculations import (
@@ -751,7 +752,6 @@ def main():
         
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 
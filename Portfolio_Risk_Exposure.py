@@ -13,6 +13,7 @@ import json
 from scipy import stats
 from datetime import datetime
 import os
+import traceback
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
@@ -1156,7 +1157,6 @@ def main():
         
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
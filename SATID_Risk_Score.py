@@ -15,6 +15,7 @@ import numpy as np
 import json
 from datetime import datetime
 import os
+import traceback
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
@@ -875,7 +876,6 @@ def main():
         
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
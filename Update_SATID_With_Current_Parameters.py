@@ -24,6 +24,7 @@ import numpy as np
 import json
 from datetime import datetime
 import os
+import traceback
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
@@ -1686,7 +1687,6 @@ def main():
         print("\nMake sure all files are in the same directory as this script.")
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 
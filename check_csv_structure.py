@@ -1,7 +1,10 @@
 """
 DIAGNOSTIC: Check CSV structure and HEAL price timeline
 """
+import itertools
+import numpy as np
 import pandas as pd
+import pyarrow.csv as pacsv
 
 CSV_FILE = 'SATID_portfolio_etf_data_weekly_ohlc.csv'
 
@@ -12,17 +15,21 @@ print("="*80)
 # Read the raw CSV to check structure
 print("\n[1] RAW CSV INSPECTION (first 10 lines):")
 with open(CSV_FILE, 'r') as f:
-    for i, line in enumerate(f):
-        if i < 10:
-            print(f"  Line {i}: {line.strip()[:100]}")  # First 100 chars
-        else:
-            break
+    for i, line in enumerate(itertools.islice(f, 10)):
+        print(f"  Line {i}: {line.strip()[:100]}")  # First 100 chars
 
-# Load and analyze
+# The header line alone gives the column inventory without parsing the body
+with open(CSV_FILE, 'r') as f:
+    all_columns = f.readline().rstrip('\n').split(',')
+
+# Load and analyze - parse only the columns the checks below touch
 print("\n[2] LOADED DATAFRAME:")
-df = pd.read_csv(CSV_FILE)
-print(f"  Shape: {df.shape} (rows × columns)")
-print(f"  Columns: {df.columns.tolist()[:10]}")  # First 10 columns
+wanted = [c for c in all_columns if c in ('date', 'Date', 'HEAL_close')]
+table = pacsv.read_csv(CSV_FILE, convert_options=pacsv.ConvertOptions(include_columns=wanted))
+df = table.to_pandas(self_destruct=True)
+df = df.rename(columns={'Date': 'date'})
+print(f"  Shape: ({len(df)}, {len(all_columns)}) (rows × columns)")
+print(f"  Columns: {all_columns[:10]}")  # First 10 columns
 
 # Check date column
 if 'date' in df.columns:
@@ -40,36 +47,42 @@ if 'date' in df.columns:
     print(f"    Max gap: {date_diffs.max()}")
     print(f"    Most common gap: {date_diffs.mode()[0] if len(date_diffs.mode()) > 0 else 'N/A'}")
     
-    # Show last 10 dates
+    # Show last 10 dates (plain arrays; iterrows builds a Series per row)
     print(f"\n  Last 10 dates in CSV:")
-    for idx, row in df_sorted.tail(10).iterrows():
-        heal_price = row.get('HEAL_close', 'N/A')
-        print(f"    {row['date'].date()}: HEAL = ${heal_price:.2f}" if isinstance(heal_price, (int, float)) else f"    {row['date'].date()}: HEAL = {heal_price}")
+    tail_dates = df_sorted['date'].dt.date.to_numpy()[-10:]
+    if 'HEAL_close' in df_sorted.columns:
+        tail_heal = df_sorted['HEAL_close'].to_numpy()[-10:]
+    else:
+        tail_heal = ['N/A'] * len(tail_dates)
+    for d, heal_price in zip(tail_dates, tail_heal):
+        print(f"    {d}: HEAL = ${heal_price:.2f}" if isinstance(heal_price, (int, float)) else f"    {d}: HEAL = {heal_price}")
 
 # Check if HEAL_close exists
 if 'HEAL_close' in df.columns:
     print(f"\n[4] HEAL PRICE DATA:")
     heal_data = df[['date', 'HEAL_close']].dropna()
+    heal_dates = heal_data['date'].reset_index(drop=True)
+    heal = heal_data['HEAL_close'].to_numpy()
     print(f"  Non-null HEAL prices: {len(heal_data)}")
     print(f"  Last 10 HEAL entries:")
-    for idx, row in heal_data.tail(10).iterrows():
-        print(f"    {row['date']}: ${row['HEAL_close']:.2f}")
-    
+    for d, price in zip(heal_dates.iloc[-10:], heal[-10:]):
+        print(f"    {d}: ${price:.2f}")
+
     # Check for 26.56
-    price_26_56 = heal_data[heal_data['HEAL_close'].between(26.55, 26.57)]
-    if len(price_26_56) > 0:
+    mask_26_56 = (heal >= 26.55) & (heal <= 26.57)
+    if mask_26_56.any():
         print(f"\n  ⚠ Found $26.56 HEAL price at:")
-        for idx, row in price_26_56.iterrows():
-            print(f"    {row['date']}")
+        for d in heal_dates.iloc[np.flatnonzero(mask_26_56)]:
+            print(f"    {d}")
     else:
         print(f"\n  No $26.56 price found in HEAL data")
-    
+
     # Check for 28.28
-    price_28_28 = heal_data[heal_data['HEAL_close'].between(28.27, 28.29)]
-    if len(price_28_28) > 0:
+    mask_28_28 = (heal >= 28.27) & (heal <= 28.29)
+    if mask_28_28.any():
         print(f"\n  ✓ Found $28.28 HEAL price at:")
-        for idx, row in price_28_28.iterrows():
-            print(f"    {row['date']}")
+        for d in heal_dates.iloc[np.flatnonzero(mask_28_28)]:
+            print(f"    {d}")
     else:
         print(f"\n  No $28.28 price found in HEAL data")
 
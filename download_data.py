@@ -4,9 +4,12 @@ ETF Data Downloader - Python 3.13 Compatible
 
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+import functools
 import os
-import time
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 ETF_LIST = {
     "CASH": ["BIL"],
@@ -31,38 +34,38 @@ def download_etf_data(start_date=None, end_date=None):
     print(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     print("This may take a few minutes...\n")
     
+    # One batched request; yfinance fans the tickers out across its own
+    # thread pool, so wall-clock is bounded by the slowest ticker instead
+    # of N sequential round-trips plus per-ticker sleeps
+    data = yf.download(all_etfs, start=start_date, end=end_date,
+                       auto_adjust=True, group_by='ticker',
+                       threads=True, progress=False)
+    downloaded = set(data.columns.get_level_values(0)) if isinstance(data.columns, pd.MultiIndex) else set()
+
     # Store series in a dictionary
     price_series = {}
-    successful = 0
     failed = []
-    
+
     for i, ticker in enumerate(all_etfs, 1):
-        try:
-            print(f"[{i}/{len(all_etfs)}] Downloading {ticker}...", end=" ")
-            
-            # Download data
-            ticker_obj = yf.Ticker(ticker)
-            data = ticker_obj.history(start=start_date, end=end_date, auto_adjust=True)
-            
-            if not data.empty and 'Close' in data.columns:
-                # Extract the Close series directly
-                price_series[ticker] = data['Close'].copy()
-                successful += 1
-                print("✓")
-            else:
-                print("✗ (no data)")
-                failed.append(ticker)
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f"✗ (error: {str(e)[:50]})")
+        print(f"[{i}/{len(all_etfs)}] {ticker}...", end=" ")
+        if ticker in downloaded and not data[ticker]['Close'].dropna().empty:
+            # Extract the Close series directly
+            price_series[ticker] = data[ticker]['Close'].copy()
+            print("✓")
+        else:
+            print("✗ (no data)")
             failed.append(ticker)
+
+    successful = len(price_series)
     
-    # Create DataFrame from the series dictionary
+    # Assemble one pre-aligned float64 block instead of letting the
+    # DataFrame constructor union-align each series column by column
     if price_series:
-        prices = pd.DataFrame(price_series)
-        prices = prices.ffill()
+        idx = functools.reduce(lambda a, b: a.union(b), (s.index for s in price_series.values()))
+        arr = np.full((len(idx), len(price_series)), np.nan)
+        for j, series in enumerate(price_series.values()):
+            arr[np.searchsorted(idx.values, series.index.values), j] = series.to_numpy()
+        prices = pd.DataFrame(arr, index=idx, columns=list(price_series)).ffill()
     else:
         raise ValueError("No data downloaded successfully")
     
@@ -78,7 +81,9 @@ def download_etf_data(start_date=None, end_date=None):
 
 def save_data(prices, filename='etf_prices.csv'):
     """Save price data to CSV file"""
-    prices.to_csv(filename)
+    # pyarrow's writer is multithreaded; pandas to_csv formats row by row
+    table = pa.Table.from_pandas(prices.rename_axis('Date').reset_index())
+    pacsv.write_csv(table, filename)
     size_kb = os.path.getsize(filename) / 1024
     print(f"\n✓ Data saved to {filename} ({size_kb:.2f} KB)")
 
@@ -6,9 +6,12 @@ Adjusted close includes dividends and splits for true performance measurement
 
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+import functools
 import os
-import time
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 ETF_LIST = {
     "CASH": ["BIL"],
@@ -54,40 +57,40 @@ def download_etf_data_monthly(start_date=None, end_date=None):
     print(f"Data includes: Dividends + Splits (Total Return)")
     print("This may take a few minutes...\n")
     
+    # One batched request; yfinance fans the tickers out across its own
+    # thread pool, so wall-clock is bounded by the slowest ticker instead
+    # of N sequential round-trips plus per-ticker sleeps
+    # CRITICAL: Do NOT use auto_adjust=True, instead get 'Adj Close' explicitly
+    # This ensures we get dividend-adjusted total return data
+    data = yf.download(all_etfs, start=start_date, end=end_date, interval="1mo",
+                       auto_adjust=False, group_by='ticker',
+                       threads=True, progress=False)
+    downloaded = set(data.columns.get_level_values(0)) if isinstance(data.columns, pd.MultiIndex) else set()
+
     # Store series in a dictionary
     price_series = {}
-    successful = 0
     failed = []
-    
+
     for i, ticker in enumerate(all_etfs, 1):
-        try:
-            print(f"[{i}/{len(all_etfs)}] Downloading {ticker}...", end=" ")
-            
-            # Download data with monthly interval
-            ticker_obj = yf.Ticker(ticker)
-            # CRITICAL: Do NOT use auto_adjust=True, instead get 'Adj Close' explicitly
-            # This ensures we get dividend-adjusted total return data
-            data = ticker_obj.history(start=start_date, end=end_date, interval="1mo", auto_adjust=False)
-            
-            if not data.empty and 'Adj Close' in data.columns:
-                # Use Adj Close for total return (includes dividends)
-                price_series[ticker] = data['Adj Close'].copy()
-                successful += 1
-                print("✓")
-            else:
-                print("✗ (no data)")
-                failed.append(ticker)
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f"✗ (error: {str(e)[:50]})")
+        print(f"[{i}/{len(all_etfs)}] {ticker}...", end=" ")
+        if ticker in downloaded and not data[ticker]['Adj Close'].dropna().empty:
+            # Use Adj Close for total return (includes dividends)
+            price_series[ticker] = data[ticker]['Adj Close'].copy()
+            print("✓")
+        else:
+            print("✗ (no data)")
             failed.append(ticker)
+
+    successful = len(price_series)
     
-    # Create DataFrame from the series dictionary
+    # Assemble one pre-aligned float64 block instead of letting the
+    # DataFrame constructor union-align each series column by column
     if price_series:
-        prices = pd.DataFrame(price_series)
-        prices = prices.ffill()
+        idx = functools.reduce(lambda a, b: a.union(b), (s.index for s in price_series.values()))
+        arr = np.full((len(idx), len(price_series)), np.nan)
+        for j, series in enumerate(price_series.values()):
+            arr[np.searchsorted(idx.values, series.index.values), j] = series.to_numpy()
+        prices = pd.DataFrame(arr, index=idx, columns=list(price_series)).ffill()
     else:
         raise ValueError("No data downloaded successfully")
     
@@ -124,12 +127,14 @@ def validate_spy_returns(prices):
     total_diff = 0
     count = 0
     
+    # One grouped first/last reduction instead of a boolean re-scan per year
+    yearly = spy_prices.groupby(dates.year).agg(['first', 'last', 'count'])
+    # Calculate using SIMPLE returns (standard for ETF reporting)
+    yearly_returns = yearly['last'] / yearly['first'] - 1
+
     for year in sorted(SPY_BENCHMARK_RETURNS.keys()):
-        year_data = spy_prices[dates.year == year]
-        
-        if len(year_data) >= 2:
-            # Calculate using SIMPLE returns (standard for ETF reporting)
-            calculated_return = (year_data.iloc[-1] / year_data.iloc[0]) - 1
+        if year in yearly.index and yearly.loc[year, 'count'] >= 2:
+            calculated_return = yearly_returns.loc[year]
             official_return = SPY_BENCHMARK_RETURNS[year]
             difference = calculated_return - official_return
             
@@ -169,7 +174,9 @@ def validate_spy_returns(prices):
 
 def save_data(prices, filename='etf_prices_monthly.csv'):
     """Save price data to CSV file"""
-    prices.to_csv(filename)
+    # pyarrow's writer is multithreaded; pandas to_csv formats row by row
+    table = pa.Table.from_pandas(prices.rename_axis('Date').reset_index())
+    pacsv.write_csv(table, filename)
     size_kb = os.path.getsize(filename) / 1024
     print(f"\n✓ Data saved to {filename} ({size_kb:.2f} KB)")
 
@@ -8,15 +8,16 @@ SATID ETF Weekly OHLC Downloader
 
 import yfinance as yf
 import pandas as pd
+import functools
 import os
 from datetime import datetime, timedelta
-import time
 
 # === CONFIGURATION ===
 PORTFOLIO_PATH = os.path.expanduser(
     "~/Library/Mobile Documents/com~apple~CloudDocs/Documents/Portfolio Management/Python/SATID/Model Portfolio.xlsx"
 )
 OUTPUT_CSV = "SATID_portfolio_etf_data_weekly_ohlc.csv"
+OUTPUT_PARQUET = "SATID_portfolio_etf_data_weekly_ohlc.parquet"
 START_DATE = datetime.now() - timedelta(days=365 * 10)  # 10 years
 END_DATE = datetime.now()
 
@@ -26,21 +27,16 @@ def get_active_etfs():
     if not os.path.exists(PORTFOLIO_PATH):
         raise FileNotFoundError(f"Portfolio not found: {PORTFOLIO_PATH}")
 
-    df = pd.read_excel(PORTFOLIO_PATH, sheet_name="Portfolio", header=None)
-    active = []
+    # Only the ticker/allocation/USD columns matter; column arithmetic
+    # replaces the per-row Series materialization of iterrows
+    df = pd.read_excel(PORTFOLIO_PATH, sheet_name="Portfolio", header=None,
+                       usecols=[2, 4, 5], names=['ticker', 'alloc', 'usd'])
 
-    for idx, row in df.iterrows():
-        if len(row) < 6:
-            continue
-        ticker_cell = row.iloc[2] if len(row) > 2 else None
-        alloc_pct = row.iloc[4] if len(row) > 4 else 0
-        usd_amount = row.iloc[5] if len(row) > 5 else 0
-
-        if pd.notna(ticker_cell) and isinstance(ticker_cell, str):
-            ticker = ticker_cell.strip().upper()
-            if alloc_pct > 0 or usd_amount > 0:
-                if ticker not in active:
-                    active.append(ticker)
+    is_ticker = df['ticker'].map(type).eq(str)
+    held = ((pd.to_numeric(df['alloc'], errors='coerce').fillna(0) > 0) |
+            (pd.to_numeric(df['usd'], errors='coerce').fillna(0) > 0))
+    active = (df.loc[is_ticker & held, 'ticker'].astype(str)
+              .str.strip().str.upper().drop_duplicates().tolist())
 
     print(f"Found {len(active)} active ETFs: {', '.join(sorted(active))}")
     return active
@@ -48,54 +44,69 @@ def get_active_etfs():
 # === STEP 2: DOWNLOAD WEEKLY OHLC ===
 def download_weekly_ohlc(tickers):
     print(f"\nDownloading weekly OHLC for {len(tickers)} ETFs...")
-    data = {}
+    frames = []
     failed = []
 
+    # One batched request; yfinance fetches the tickers on its own thread
+    # pool, so wall time is bounded by the slowest symbol instead of the
+    # serial per-ticker round-trips plus sleeps
+    raw = yf.download(tickers, start=START_DATE, end=END_DATE, interval="1d",
+                      group_by="ticker", threads=min(len(tickers), 20),
+                      auto_adjust=True, progress=False)
+    downloaded = set(raw.columns.get_level_values(0)) if isinstance(raw.columns, pd.MultiIndex) else set()
+
+    # One weekly aggregation across every (ticker, field) column - a
+    # single grouper pass instead of one resample per ticker. Weeks a
+    # ticker never traded come out NaN and are dropped per ticker below,
+    # matching the old per-ticker resample of its own date range. Volume
+    # was aggregated before but never saved, so it is skipped here
+    weekly_all = pd.DataFrame()
+    if downloaded:
+        agg = {}
+        for ticker in tickers:
+            if ticker in downloaded:
+                agg[(ticker, 'Open')] = 'first'
+                agg[(ticker, 'High')] = 'max'
+                agg[(ticker, 'Low')] = 'min'
+                agg[(ticker, 'Close')] = 'last'
+        weekly_all = raw.resample('W-FRI').agg(agg)
+        weekly_all = weekly_all[weekly_all.index.weekday == 4]
+
     for i, ticker in enumerate(tickers, 1):
         try:
             print(f"[{i:2d}/{len(tickers)}] {ticker:<6}", end=" ")
-            t = yf.Ticker(ticker)
+            daily_rows = int(raw[ticker].notna().any(axis=1).sum()) if ticker in downloaded else 0
 
-            hist = t.history(start=START_DATE, end=END_DATE, interval="1d", auto_adjust=True)
-
-            if hist.empty or len(hist) < 50:
+            if daily_rows < 50:
                 print("No data")
                 failed.append(ticker)
                 continue
 
-            weekly = hist.resample('W-FRI').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            })
-
-            weekly = weekly[weekly.index.weekday == 4]
-            weekly = weekly.dropna()
+            weekly = weekly_all[ticker].dropna()
 
             if len(weekly) < 10:
                 print(f"Too few weeks ({len(weekly)})")
                 failed.append(ticker)
                 continue
 
-            for col in ['Open', 'High', 'Low', 'Close']:
-                key = f"{ticker}_{col.lower()}"
-                data[key] = weekly[col]
+            block = weekly[['Open', 'High', 'Low', 'Close']].copy()
+            block.columns = [f"{ticker}_{col.lower()}" for col in block.columns]
+            frames.append(block)
 
             print(f"{len(weekly)} weeks")
-            time.sleep(0.25)
 
         except Exception as e:
             print(f"Error")
             failed.append(ticker)
 
-    if not data:
+    if not frames:
         raise ValueError("No ETF data downloaded!")
 
-    df = pd.DataFrame(data)
-    df = df.sort_index()
-    df = df.ffill().bfill()
+    # Align each block against one master weekly grid and fill per block;
+    # filling is column-wise anyway, so this matches the old whole-matrix
+    # ffill/bfill without the dict-of-Series outer join and extra scan
+    idx = functools.reduce(lambda a, b: a.union(b), (f.index for f in frames))
+    df = pd.concat([f.reindex(idx).ffill().bfill() for f in frames], axis=1)
 
     print(f"\nSuccess: {len(tickers) - len(failed)}/{len(tickers)}")
     if failed:
@@ -106,8 +117,12 @@ def download_weekly_ohlc(tickers):
 # === STEP 3: SAVE TO CSV ===
 def save_data(df):
     df.to_csv(OUTPUT_CSV)
+    # Columnar binary copy: smaller, loads without reparsing text or
+    # re-deriving dtypes, and keeps the DatetimeIndex intact. The CSV
+    # stays the canonical file for the scripts that still read it
+    df.to_parquet(OUTPUT_PARQUET, compression="zstd")
     size_mb = os.path.getsize(OUTPUT_CSV) / (1024 * 1024)
-    print(f"\nSaved to: {OUTPUT_CSV}")
+    print(f"\nSaved to: {OUTPUT_CSV} (+ {OUTPUT_PARQUET})")
     print(f"   Size: {size_mb:.2f} MB")
     print(f"   Weeks: {len(df)}")
     print(f"   First date: {df.index[0].strftime('%Y-%m-%d')}")
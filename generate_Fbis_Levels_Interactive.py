@@ -25,10 +25,21 @@ Date: December 2025
 
 import pandas as pd
 import numpy as np
+import base64
+import gzip
+import hashlib
+import io
 import json
+import orjson
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from scipy import stats
+from functools import lru_cache
+from string import Template
+from numba import njit
+from scipy.signal import argrelextrema
 import os
+import re
+import traceback
 
 # ================================
 # CONFIGURATION
@@ -36,6 +47,11 @@ import os
 CSV_FILE = "SATID_portfolio_etf_data_weekly_ohlc.csv"
 PARAMS_FILE = "SATID_Fbis_Optimized_Parameters.json"
 OUTPUT_HTML = "Support_Levels_Interactive.html"
+CSS_FILE = "satid.css"
+CACHE_FILE = ".satid_cache"  # fingerprint of the inputs behind OUTPUT_HTML
+INLINE_CSS = False  # True restores self-contained single-file output
+
+NS_PER_DAY = 86_400_000_000_000
 
 # Scoring parameters
 SUPPORT_TEST_REWARD = 1.0
@@ -106,458 +122,11 @@ CONSTRAINTS = {
 }
 
 
-# ================================
-# TREND DETECTION FUNCTIONS
-# ================================
-def find_swing_highs(high_series, window=4):
-    """Find swing highs (local maxima)"""
-    swing_highs = []
-    for i in range(window, len(high_series) - window):
-        local_window = high_series.iloc[i-window:i+window+1]
-        if high_series.iloc[i] == local_window.max():
-            swing_highs.append({'date': high_series.index[i], 'price': high_series.iloc[i]})
-    return swing_highs
-
-
-def find_swing_lows(low_series, window=4):
-    """Find swing lows (local minima)"""
-    swing_lows = []
-    for i in range(window, len(low_series) - window):
-        local_window = low_series.iloc[i-window:i+window+1]
-        if low_series.iloc[i] == local_window.min():
-            swing_lows.append({'date': low_series.index[i], 'price': low_series.iloc[i]})
-    return swing_lows
-
-
-def identify_lower_highs(swing_highs, min_highs=2):
-    """Identify sequence of lower highs (downtrend)"""
-    if len(swing_highs) < min_highs:
-        return []
-    
-    sequences = []
-    for start_idx in range(len(swing_highs) - 1):
-        sequence = [swing_highs[start_idx]]
-        for j in range(start_idx + 1, len(swing_highs)):
-            if swing_highs[j]['price'] < sequence[-1]['price']:
-                sequence.append(swing_highs[j])
-            else:
-                break
-        if len(sequence) >= min_highs:
-            sequences.append(sequence)
-    
-    return max(sequences, key=len) if sequences else []
-
-
-def create_downtrend_line(lower_highs):
-    """Create linear resistance line connecting lower highs"""
-    if len(lower_highs) < 2:
-        return None
-    
-    first_date = lower_highs[0]['date']
-    dates_numeric = [(h['date'] - first_date).days for h in lower_highs]
-    prices = [h['price'] for h in lower_highs]
-    
-    slope, intercept, r_value, _, _ = stats.linregress(dates_numeric, prices)
-    
-    def resistance_at_date(date):
-        return slope * (date - first_date).days + intercept
-    
-    return {'function': resistance_at_date, 'r_squared': r_value ** 2, 'first_date': first_date}
-
-
-def detect_breakout(close_series, downtrend_line, start_after_date):
-    """Detect when price breaks above downtrend line"""
-    if downtrend_line is None:
-        return None
-    
-    resistance_func = downtrend_line['function']
-    check_data = close_series[close_series.index > start_after_date]
-    
-    for date in check_data.index:
-        if check_data.loc[date] > resistance_func(date):
-            return {'date': date, 'price': check_data.loc[date]}
-    return None
-
-
-def confirm_higher_low(low_series, breakout_info, pre_breakout_low, weeks_to_wait=12):
-    """Confirm breakout with higher low"""
-    if breakout_info is None:
-        return None
-    
-    breakout_date = breakout_info['date']
-    confirmation_window = low_series[
-        (low_series.index > breakout_date) & 
-        (low_series.index <= breakout_date + pd.DateOffset(weeks=weeks_to_wait))
-    ]
-    
-    if len(confirmation_window) == 0:
-        return None
-    
-    pullback_low_price = confirmation_window.min()
-    if pullback_low_price > pre_breakout_low['price']:
-        return {'date': confirmation_window.idxmin(), 'confirmed': True}
-    return None
-
-
-def detect_trend_change(close_series, high_series, low_series):
-    """
-    Detect trend change using downtrend line breakout method
-    Returns: (trend_start_date, detection_info)
-    """
-    swing_highs = find_swing_highs(high_series, window=4)
-    if len(swing_highs) < 2:
-        return close_series.idxmin(), {}
-    
-    lower_highs = identify_lower_highs(swing_highs, min_highs=2)
-    if len(lower_highs) < 2:
-        return close_series.idxmin(), {}
-    
-    downtrend_line = create_downtrend_line(lower_highs)
-    if downtrend_line is None:
-        return close_series.idxmin(), {}
-    
-    breakout = detect_breakout(close_series, downtrend_line, lower_highs[-1]['date'])
-    if breakout is None:
-        return close_series.idxmin(), {}
-    
-    swing_lows = find_swing_lows(low_series, window=4)
-    pre_breakout_lows = [l for l in swing_lows if l['date'] < breakout['date']]
-    
-    if not pre_breakout_lows:
-        return breakout['date'], {'breakout': breakout}
-    
-    confirmation = confirm_higher_low(low_series, breakout, pre_breakout_lows[-1])
-    
-    if confirmation and confirmation['confirmed']:
-        return confirmation['date'], {'breakout': breakout, 'confirmation': confirmation}
-    return breakout['date'], {'breakout': breakout}
-
-
-# ================================
-# OPTIMIZATION CLASS
-# ================================
-class ConstrainedFbisOptimizer:
-    """Optimize Fbis support level with constrained search"""
-    
-    def __init__(self, ticker, close_series, high_series, low_series):
-        self.ticker = ticker
-        self.close = close_series
-        self.high = high_series
-        self.low = low_series
-        
-        # Get asset class and constraints
-        self.asset_class = ASSET_CLASSES.get(ticker, 'large_cap')
-        self.constraints = CONSTRAINTS.get(self.asset_class, CONSTRAINTS['large_cap'])
-        
-        # Detect trend change
-        self.trend_start, self.detection_info = detect_trend_change(
-            close_series, high_series, low_series)
-    
-    def _calculate_ema(self, period):
-        """Calculate EMA for given period"""
-        return self.close.ewm(span=period, adjust=False).mean()
-    
-    def optimize(self):
-        """
-        Find optimal EMA period and vertical shift using constrained search
-        
-        Returns:
-            dict with keys: period, shift, tests, breaches, score, trend_start
-        """
-        # Filter data for optimization period (from trend start)
-        opt_mask = self.close.index >= self.trend_start
-        opt_close = self.close[opt_mask]
-        opt_low = self.low[opt_mask]
-        
-        if len(opt_close) < 10:
-            return {
-                'period': 20, 'shift': -0.05, 'tests': 0, 'breaches': 0, 
-                'score': 0, 'trend_start': self.trend_start
-            }
-        
-        best = None
-        best_score = -999999
-        
-        # Grid search over CONSTRAINED parameter space
-        for period in self.constraints['ema_range']:
-            ema_full = self._calculate_ema(period)
-            ema = ema_full[opt_mask]
-            
-            for shift in self.constraints['shift_range']:
-                fbis_line = ema * (1 + shift)
-                
-                support_tests = 0
-                breaches = 0
-                
-                # Evaluate each week
-                for i in range(len(opt_close)):
-                    fbis_level = fbis_line.iloc[i]
-                    low_price = opt_low.iloc[i]
-                    close_price = opt_close.iloc[i]
-                    
-                    distance_pct = ((low_price - fbis_level) / fbis_level) * 100
-                    
-                    # Support test: low touches within tolerance AND close holds above
-                    if -TOUCH_TOLERANCE_PCT <= distance_pct <= TOUCH_TOLERANCE_PCT:
-                        if close_price >= fbis_level:
-                            support_tests += 1
-                    # Breach: close finishes below Fbis
-                    elif close_price < fbis_level:
-                        breaches += 1
-                
-                # Calculate score
-                score = (support_tests * SUPPORT_TEST_REWARD) - (breaches * BREACH_PENALTY)
-                
-                # Track best parameters
-                if score > best_score:
-                    best_score = score
-                    best = {
-                        'period': period,
-                        'shift': shift,
-                        'tests': support_tests,
-                        'breaches': breaches,
-                        'score': score,
-                        'trend_start': self.trend_start,
-                        'asset_class': self.asset_class
-                    }
-        
-        return best or {
-            'period': 20, 'shift': -0.05, 'tests': 0, 'breaches': 0, 
-            'score': 0, 'trend_start': self.trend_start
-        }
-
-
-# ================================
-# DATA LOADING
-# ================================
-def load_etf_prices(csv_file):
-    """Load weekly OHLC price data for all ETFs"""
-    print(f"📊 Loading price data from {csv_file}...")
-    df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
-    
-    # Ensure index is DatetimeIndex and remove timezone
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index, utc=True)
-    if df.index.tz is not None:
-        df.index = df.index.tz_localize(None)
-    
-    # Extract unique tickers
-    tickers = [col.replace('_close', '') for col in df.columns if col.endswith('_close')]
-    print(f"  ✓ Loaded {len(tickers)} ETFs")
-    print(f"  ✓ Date range: {df.index[0].date()} to {df.index[-1].date()}")
-    print(f"  ✓ Total weeks: {len(df)}")
-    
-    return df, tickers
-
-
-# ================================
-# OPTIMIZATION RUNNER
-# ================================
-def optimize_all_etfs(df, tickers):
-    """Run constrained optimization for all ETFs"""
-    print(f"\n🔍 Running CONSTRAINED BREAKOUT optimization for {len(tickers)} ETFs...")
-    print(f"   Method: Automatic trend detection + asset-class constraints")
-    print(f"   Breach penalty: {BREACH_PENALTY} (accepts breaches as signals)\n")
-    
-    params = {}
-    
-    for idx, ticker in enumerate(tickers, 1):
-        print(f"[{idx}/{len(tickers)}] {ticker}")
-        
-        close_col = f"{ticker}_close"
-        high_col = f"{ticker}_high"
-        low_col = f"{ticker}_low"
-        
-        if close_col not in df.columns or high_col not in df.columns or low_col not in df.columns:
-            print(f"  ⚠ Warning: Missing data columns")
-            params[ticker] = {'period': 20, 'shift': -0.05}
-            continue
-        
-        close_series = df[close_col].dropna()
-        high_series = df[high_col].dropna()
-        low_series = df[low_col].dropna()
-        
-        if len(close_series) < 52:
-            print(f"  ⚠ Warning: Less than 1 year of data")
-            params[ticker] = {'period': 20, 'shift': -0.05}
-            continue
-        
-        # Run constrained optimization
-        optimizer = ConstrainedFbisOptimizer(ticker, close_series, high_series, low_series)
-        result = optimizer.optimize()
-        
-        # Print results
-        asset_class = result.get('asset_class', 'unknown')
-        trend_start = result['trend_start'].strftime('%Y-%m-%d')
-        print(f"  Class: {asset_class} | Trend from: {trend_start}")
-        print(f"  EMA({result['period']}) shift={result['shift']:.3f} | Tests={result['tests']} Breaches={result['breaches']} Score={result['score']:.1f}")
-        
-        params[ticker] = {
-            'period': result['period'],
-            'shift': result['shift']
-        }
-    
-    print(f"\n  ✓ Optimization complete for {len(params)} ETFs")
-    return params
-
-
-# ================================
-# CHART DATA GENERATION
-# ================================
-def generate_chart_data_js(df, tickers, params):
-    """Generate JavaScript with all chart data"""
-    
-    print(f"\n📈 Generating chart data for {len(tickers)} ETFs...")
-    
-    js_code = "// Chart data for all ETFs\n"
-    js_code += "const chartData = {};\n"
-    js_code += "const optimizedParams = {};\n\n"
-    
-    for ticker in tickers:
-        close_col = f"{ticker}_close"
-        if close_col not in df.columns:
-            continue
-        
-        prices = df[close_col].dropna()
-        dates = [d.strftime('%Y-%m-%d') for d in prices.index]
-        close_values = prices.tolist()
-        
-        period = params.get(ticker, {}).get('period', 20)
-        shift = params.get(ticker, {}).get('shift', -0.05)
-        
-        js_code += f"chartData['{ticker}'] = {{\n"
-        js_code += f"    dates: {json.dumps(dates)},\n"
-        js_code += f"    close: {json.dumps(close_values)}\n"
-        js_code += f"}};\n\n"
-        
-        js_code += f"optimizedParams['{ticker}'] = {{\n"
-        js_code += f"    period: {period},\n"
-        js_code += f"    shift: {shift}\n"
-        js_code += f"}};\n\n"
-    
-    print(f"  ✓ Generated chart data")
-    return js_code
-
-
-def generate_chart_html(ticker, params):
-    """Generate HTML for a single chart with controls"""
-    
-    period = params.get(ticker, {}).get('period', 20)
-    shift = params.get(ticker, {}).get('shift', -0.05)
-    shift_pct = shift * 100
-    
-    html = f"""
-    <!-- {ticker} Chart -->
-    <div class="chart-section">
-        <h2>{ticker}</h2>
-        
-        <div class="controls">
-            <div class="control-group">
-                <label for="{ticker}_period">EMA Period: <span id="{ticker}_period_value">{period}</span></label>
-                <input type="range" id="{ticker}_period" min="8" max="50" value="{period}" step="1">
-            </div>
-            
-            <div class="control-group">
-                <label for="{ticker}_shift">Vertical Shift: <span id="{ticker}_shift_value">{shift_pct:.1f}%</span></label>
-                <input type="range" id="{ticker}_shift" min="-20" max="5" value="{shift_pct:.1f}" step="0.1">
-            </div>
-        </div>
-        
-        <div id="{ticker}_chart" class="chart-display"></div>
-    </div>
-    
-    <script>
-    (function() {{
-        const ticker = '{ticker}';
-        const chartDiv = document.getElementById(ticker + '_chart');
-        const periodSlider = document.getElementById(ticker + '_period');
-        const shiftSlider = document.getElementById(ticker + '_shift');
-        const periodValue = document.getElementById(ticker + '_period_value');
-        const shiftValue = document.getElementById(ticker + '_shift_value');
-        
-        // Store current values globally for saving
-        window['current_period_' + ticker] = {period};
-        window['current_shift_' + ticker] = {shift};
-        
-        function updateChart() {{
-            const period = parseInt(periodSlider.value);
-            const shift = parseFloat(shiftSlider.value) / 100;
-            
-            periodValue.textContent = period;
-            shiftValue.textContent = (shift * 100).toFixed(1) + '%';
-            
-            window['current_period_' + ticker] = period;
-            window['current_shift_' + ticker] = shift;
-            
-            const dates = chartData[ticker].dates;
-            const close = chartData[ticker].close;
-            const ema = calculateEMA(close, period);
-            const fbis = ema.map(e => e * (1 + shift));
-            
-            // Filter data for chart display (from January 2020)
-            const chartStartIdx = dates.findIndex(d => d >= '2020-01-01');
-            const displayDates = dates.slice(chartStartIdx);
-            const displayClose = close.slice(chartStartIdx);
-            
-            // Filter Fbis line (from September 2022)
-            const fbisStartIdx = dates.findIndex(d => d >= '2022-09-01');
-            const fbisDates = dates.slice(fbisStartIdx);
-            const displayFbis = fbis.slice(fbisStartIdx);
-            
-            const traces = [
-                {{
-                    x: displayDates,
-                    y: displayClose,
-                    name: 'Price',
-                    type: 'scatter',
-                    line: {{ color: 'black', width: 2.5 }}
-                }},
-                {{
-                    x: fbisDates,
-                    y: displayFbis,
-                    name: `Fbis (EMA${{period}} ${{(shift*100).toFixed(1)}}%)`,
-                    type: 'scatter',
-                    line: {{ color: 'red', width: 2, dash: 'dot' }}
-                }}
-            ];
-            
-            const layout = {{
-                title: `${{ticker}} - Adjustable Support (EMA${{period}} @ ${{(shift*100).toFixed(1)}}%)`,
-                xaxis: {{ title: 'Date', type: 'date' }},
-                yaxis: {{ title: 'Price ($)' }},
-                hovermode: 'x unified',
-                showlegend: true,
-                legend: {{ x: 0, y: 1 }},
-                height: 480,
-                margin: {{ l: 60, r: 30, t: 40, b: 40 }}
-            }};
-            
-            Plotly.newPlot(chartDiv, traces, layout, {{responsive: true}});
-        }}
-        
-        periodSlider.addEventListener('input', updateChart);
-        shiftSlider.addEventListener('input', updateChart);
-        
-        updateChart();
-    }})();
-    </script>
-"""
-    
-    return html
-
-
-# ================================
-# HTML GENERATION
-# ================================
-def generate_html(df, tickers, params):
-    """Generate complete standalone HTML"""
-    
-    print(f"\n🔨 Generating HTML...")
-    
-    chart_data_js = generate_chart_data_js(df, tickers, params)
-    
-    # Read the SATID master CSS
-    satid_css = """/* ============================================
+# Master stylesheet shared by the generated page; defined once at
+# module level instead of being rebuilt on every generate_html call.
+# Edit this pretty-printed source - the served constant below is the
+# minified form
+SATID_CSS_SRC = """/* ============================================
    SATID Website - COMPLETE MASTER STYLESHEET
    ============================================ */
 
@@ -567,6 +136,13 @@ def generate_html(df, tickers, params):
     box-sizing: border-box;
 }
 
+/* Shared brand gradients/shadows, declared once */
+:root {
+    --grad-brand: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+    --grad-brand-3: linear-gradient(135deg, #1e3c72 0%, #2a5298 50%, #3d6cb9 100%);
+    --shadow-thumb: 0 2px 4px rgba(42, 82, 152, 0.3);
+}
+
 body {
     font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
     line-height: 1.6;
@@ -575,7 +151,7 @@ body {
 }
 
 .navbar {
-    background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+    background: var(--grad-brand);
     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
     position: sticky;
     top: 0;
@@ -671,7 +247,7 @@ body {
 }
 
 .hero {
-    background: linear-gradient(135deg, #1e3c72 0%, #2a5298 50%, #3d6cb9 100%);
+    background: var(--grad-brand-3);
     padding: 40px 20px 80px;
     position: relative;
     overflow: hidden;
@@ -686,8 +262,8 @@ body {
     left: 0;
     right: 0;
     bottom: 0;
-    background: url('data:image/svg+xml,<svg width="100" height="100" xmlns="http://www.w3.org/2000/svg"><rect width="1" height="1" fill="rgba(255,255,255,0.03)"/></svg>') repeat;
-    opacity: 0.5;
+    /* same wash as the old tiled 1x1 SVG (0.03 alpha at 0.5 opacity) */
+    background-color: rgba(255, 255, 255, 0.015);
 }
 
 .hero-content {
@@ -751,7 +327,7 @@ body {
 }
 
 footer {
-    background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+    background: var(--grad-brand);
     color: rgba(255, 255, 255, 0.9);
     text-align: center;
     padding: 30px 20px;
@@ -807,122 +383,487 @@ footer p {
     font-size: 0.95rem;
 }
 
-.control-group input[type="range"] {
-    width: 100%;
-    height: 8px;
-    border-radius: 5px;
-    background: #e9ecef;
-    outline: none;
-    -webkit-appearance: none;
-}
+.control-group input[type="range"] {
+    width: 100%;
+    height: 8px;
+    border-radius: 5px;
+    background: #e9ecef;
+    outline: none;
+    -webkit-appearance: none;
+}
+
+.control-group input[type="range"]::-webkit-slider-thumb {
+    -webkit-appearance: none;
+    appearance: none;
+    width: 18px;
+    height: 18px;
+    border-radius: 50%;
+    background: #2a5298;
+    cursor: pointer;
+    box-shadow: var(--shadow-thumb);
+}
+
+.control-group input[type="range"]::-webkit-slider-thumb:hover {
+    background: #1e3c72;
+    transform: scale(1.1);
+}
+
+.control-group input[type="range"]::-moz-range-thumb {
+    width: 18px;
+    height: 18px;
+    border-radius: 50%;
+    background: #2a5298;
+    cursor: pointer;
+    border: none;
+    box-shadow: var(--shadow-thumb);
+}
+
+.control-group input[type="range"]::-moz-range-thumb:hover {
+    background: #1e3c72;
+    transform: scale(1.1);
+}
+
+.chart-display {
+    margin-top: 20px;
+    background: white;
+    border-radius: 8px;
+    padding: 15px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
+}
+
+.save-section {
+    position: fixed;
+    top: 100px;
+    right: 20px;
+    z-index: 1000;
+}
+
+.save-btn {
+    padding: 14px 28px;
+    background: linear-gradient(135deg, #27ae60 0%, #2ecc71 100%);
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-size: 1.05rem;
+    font-weight: 600;
+    cursor: pointer;
+    box-shadow: 0 4px 12px rgba(39, 174, 96, 0.3);
+    transition: all 0.3s ease;
+    font-family: 'Inter', sans-serif;
+}
+
+.save-btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 16px rgba(39, 174, 96, 0.4);
+    background: linear-gradient(135deg, #229954 0%, #27ae60 100%);
+}
+
+@media (max-width: 768px) {
+    .hero h1 {
+        font-size: 2.5rem;
+    }
+    
+    .hero-subtitle {
+        font-size: 1.1rem;
+    }
+    
+    .chart-page-container {
+        padding: 30px 20px !important;
+    }
+    
+    .controls {
+        flex-direction: column;
+        gap: 20px;
+    }
+    
+    .nav-menu {
+        flex-direction: column;
+        gap: 10px;
+    }
+    
+    .dropdown-content {
+        position: static;
+        box-shadow: none;
+        background-color: #2c3e50;
+    }
+}"""
+
+
+def _minify_css(css):
+    """Strip comments and collapse whitespace; the rules are unchanged"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+SATID_CSS = _minify_css(SATID_CSS_SRC)
+
+# ================================
+# TREND DETECTION FUNCTIONS
+# ================================
+def find_swing_highs(high_series, window=4):
+    """Find swing highs (local maxima) as parallel (dates, prices) arrays"""
+    arr = high_series.to_numpy()
+    # >= keeps the old "equals the window max" semantics for flat tops
+    idx = argrelextrema(arr, np.greater_equal, order=window)[0]
+    idx = idx[(idx >= window) & (idx < len(arr) - window)]
+    return high_series.index.values[idx], arr[idx]
+
+
+def find_swing_lows(low_series, window=4):
+    """Find swing lows (local minima) as parallel (dates, prices) arrays"""
+    arr = low_series.to_numpy()
+    idx = argrelextrema(arr, np.less_equal, order=window)[0]
+    idx = idx[(idx >= window) & (idx < len(arr) - window)]
+    return low_series.index.values[idx], arr[idx]
+
+
+def identify_lower_highs(swing_dates, swing_prices, min_highs=2):
+    """Identify sequence of lower highs (downtrend) as (dates, prices) arrays"""
+    n = len(swing_prices)
+    if n < min_highs:
+        return swing_dates[:0], swing_prices[:0]
+
+    # Each candidate sequence is a contiguous strictly-decreasing run, so
+    # one pass over np.diff finds them all: pad the decreasing mask with
+    # False on both sides and diff again to get run start/end boundaries.
+    # argmax keeps the first run on length ties, like max(key=len) did
+    dec = np.diff(swing_prices) < 0
+    edges = np.flatnonzero(np.diff(np.r_[False, dec, False]))
+    if len(edges) == 0:
+        return swing_dates[:0], swing_prices[:0]
+
+    starts = edges[::2]
+    lengths = edges[1::2] - starts + 1  # +1 for the pivot high itself
+    best = np.argmax(lengths)
+    if lengths[best] < min_highs:
+        return swing_dates[:0], swing_prices[:0]
+
+    s, e = starts[best], starts[best] + lengths[best]
+    return swing_dates[s:e], swing_prices[s:e]
+
+
+def create_downtrend_line(lh_dates, lh_prices):
+    """Create linear resistance line connecting lower highs"""
+    if len(lh_prices) < 2:
+        return None
+
+    first_date = pd.Timestamp(lh_dates[0])
+    dates_numeric = (lh_dates - lh_dates[0]) / np.timedelta64(1, 'D')
+
+    # Closed-form least squares: linregress's p-value/stderr bookkeeping
+    # is wasted on the 2-5 points a lower-highs run contains
+    x_mean = dates_numeric.mean()
+    y_mean = lh_prices.mean()
+    x_dev = dates_numeric - x_mean
+    slope = (x_dev * (lh_prices - y_mean)).sum() / (x_dev * x_dev).sum()
+    intercept = y_mean - slope * x_mean
+
+    ss_res = ((lh_prices - (slope * dates_numeric + intercept)) ** 2).sum()
+    ss_tot = ((lh_prices - y_mean) ** 2).sum()
+    r_squared = 1.0 - ss_res / ss_tot if ss_tot else 0.0
+
+    def resistance_at_date(date):
+        return slope * (date - first_date).days + intercept
+
+    return {'function': resistance_at_date, 'slope': slope, 'intercept': intercept,
+            'r_squared': r_squared, 'first_date': first_date}
+
+
+def detect_breakout(close_series, downtrend_line, start_after_date):
+    """Detect when price breaks above downtrend line"""
+    if downtrend_line is None:
+        return None
+
+    # Evaluate the resistance line over the whole tail at once instead of
+    # a per-date .loc loop through the closure
+    close = close_series.to_numpy()
+    t = close_series.index.as_unit('ns').asi8  # match Timestamp.value resolution
+    t0 = pd.Timestamp(downtrend_line['first_date']).value
+    start = np.searchsorted(t, pd.Timestamp(start_after_date).value, side='right')
+
+    resistance = downtrend_line['slope'] * ((t[start:] - t0) // NS_PER_DAY) + downtrend_line['intercept']
+    hits = np.flatnonzero(close[start:] > resistance)
+    if len(hits) == 0:
+        return None
+
+    i = start + hits[0]
+    return {'date': close_series.index[i], 'price': close[i]}
+
+
+def confirm_higher_low(low_series, breakout_info, pre_breakout_low_price, weeks_to_wait=12):
+    """Confirm breakout with higher low"""
+    if breakout_info is None:
+        return None
+
+    breakout_date = breakout_info['date']
+    t = low_series.index.as_unit('ns').asi8
+    # On W-FRI bars the (breakout, breakout + N weeks] window is simply
+    # the next N rows - no DateOffset arithmetic needed
+    lo = np.searchsorted(t, pd.Timestamp(breakout_date).value, side='right')
+    hi = min(lo + weeks_to_wait, len(t))
+
+    if lo >= hi:
+        return None
+
+    window = low_series.to_numpy()[lo:hi]
+    i_min = int(window.argmin())
+    if window[i_min] > pre_breakout_low_price:
+        return {'date': low_series.index[lo + i_min], 'confirmed': True}
+    return None
+
+
+def detect_trend_change(close_series, high_series, low_series):
+    """
+    Detect trend change using downtrend line breakout method
+    Returns: (trend_start_date, detection_info)
+    """
+    swing_dates, swing_prices = find_swing_highs(high_series, window=4)
+    if len(swing_prices) < 2:
+        return close_series.idxmin(), {}
+
+    lh_dates, lh_prices = identify_lower_highs(swing_dates, swing_prices, min_highs=2)
+    if len(lh_prices) < 2:
+        return close_series.idxmin(), {}
+
+    downtrend_line = create_downtrend_line(lh_dates, lh_prices)
+    if downtrend_line is None:
+        return close_series.idxmin(), {}
+
+    breakout = detect_breakout(close_series, downtrend_line, lh_dates[-1])
+    if breakout is None:
+        return close_series.idxmin(), {}
+
+    low_dates, low_prices = find_swing_lows(low_series, window=4)
+    pre_breakout = low_prices[low_dates < np.datetime64(breakout['date'])]
+
+    if len(pre_breakout) == 0:
+        return breakout['date'], {'breakout': breakout}
+
+    confirmation = confirm_higher_low(low_series, breakout, pre_breakout[-1])
+
+    if confirmation and confirmation['confirmed']:
+        return confirmation['date'], {'breakout': breakout, 'confirmation': confirmation}
+    return breakout['date'], {'breakout': breakout}
+
+
+# ================================
+# OPTIMIZATION CLASS
+# ================================
+@njit(cache=True, nogil=True, fastmath=True)
+def _score_grid(close, low, emas, shifts, reward, penalty, tol):
+    """Score every (period, shift) pair; return the best cell.
+
+    Compiled inner loops keep peak memory at the EMA matrix instead of a
+    full (periods, shifts, weeks) tensor. Best cell is tracked with a
+    strict '>' in period-major, shift-major order, matching the original
+    grid-search tie-breaking.
+    """
+    best_p, best_s = 0, 0
+    best_tests, best_breaches = 0, 0
+    best_score = -1e18
+    for p in range(emas.shape[0]):
+        for s in range(shifts.shape[0]):
+            tests = 0
+            breaches = 0
+            for i in range(close.shape[0]):
+                fbis = emas[p, i] * (1.0 + shifts[s])
+                dist = (low[i] - fbis) / fbis * 100.0
+                # branchless compare+accumulate vectorizes; the old
+                # if/elif pair mispredicts on market data
+                tests += (dist >= -tol) & (dist <= tol) & (close[i] >= fbis)
+                breaches += ((dist < -tol) | (dist > tol)) & (close[i] < fbis)
+            score = tests * reward - breaches * penalty
+            if score > best_score:
+                best_score = score
+                best_p, best_s = p, s
+                best_tests, best_breaches = tests, breaches
+    return best_p, best_s, best_tests, best_breaches, best_score
+
+
+
+class ConstrainedFbisOptimizer:
+    """Optimize Fbis support level with constrained search"""
+    
+    def __init__(self, ticker, close_series, high_series, low_series):
+        self.ticker = ticker
+        self.close = close_series
+        self.high = high_series
+        self.low = low_series
+        
+        # Get asset class and constraints
+        self.asset_class = ASSET_CLASSES.get(ticker, 'large_cap')
+        self.constraints = CONSTRAINTS.get(self.asset_class, CONSTRAINTS['large_cap'])
+        
+        # Detect trend change
+        self.trend_start, self.detection_info = detect_trend_change(
+            close_series, high_series, low_series)
+    
+    def _calculate_ema(self, period):
+        """Calculate EMA for given period"""
+        return self.close.ewm(span=period, adjust=False).mean()
+    
+    def optimize(self):
+        """
+        Find optimal EMA period and vertical shift using constrained search
+        
+        Returns:
+            dict with keys: period, shift, tests, breaches, score, trend_start
+        """
+        # Filter data for optimization period (from trend start)
+        opt_mask = self.close.index >= self.trend_start
+        opt_close = self.close.to_numpy()[opt_mask]
+        opt_low = self.low.to_numpy()[opt_mask]
+
+        if len(opt_close) < 10:
+            return {
+                'period': 20, 'shift': -0.05, 'tests': 0, 'breaches': 0,
+                'score': 0, 'trend_start': self.trend_start
+            }
+
+        # Grid search over the CONSTRAINED parameter space: EMAs for all
+        # candidate periods are stacked once, then the compiled kernel
+        # scores every (period, shift) pair in a single pass
+        # float32 halves the bytes the kernel streams per grid pass and
+        # doubles SIMD lane count; cent-level prices need ~7 digits at most
+        periods = list(self.constraints['ema_range'])
+        shifts = np.asarray(self.constraints['shift_range'], dtype=np.float64)
+        emas = np.stack([self._calculate_ema(p).to_numpy()[opt_mask]
+                         for p in periods]).astype(np.float32)
+
+        p_idx, s_idx, tests, breaches, score = _score_grid(
+            opt_close.astype(np.float32), opt_low.astype(np.float32), emas,
+            shifts.astype(np.float32), SUPPORT_TEST_REWARD, BREACH_PENALTY,
+            TOUCH_TOLERANCE_PCT)
+
+        return {
+            'period': periods[p_idx],
+            'shift': float(shifts[s_idx]),
+            'tests': int(tests),
+            'breaches': int(breaches),
+            'score': float(score),
+            'trend_start': self.trend_start,
+            'asset_class': self.asset_class
+        }
+
+
+# ================================
+# DATA LOADING
+# ================================
+def load_etf_prices(csv_file):
+    """Load weekly OHLC price data for all ETFs"""
+    # Prefer the Parquet copy the downloader writes alongside the CSV:
+    # binary columnar load with dtypes and DatetimeIndex preserved, no
+    # text reparse. Fall back to the CSV if the Parquet is missing or
+    # stale (some updater scripts only rewrite the CSV)
+    parquet_file = csv_file.replace('.csv', '.parquet')
+    if (os.path.exists(parquet_file) and
+            os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file)):
+        print(f"📊 Loading price data from {parquet_file}...")
+        df = pd.read_parquet(parquet_file)
+    else:
+        print(f"📊 Loading price data from {csv_file}...")
+        df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+
+    # Ensure index is DatetimeIndex and remove timezone
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index, utc=True)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    
+    # Extract unique tickers
+    tickers = [col.replace('_close', '') for col in df.columns if col.endswith('_close')]
+    print(f"  ✓ Loaded {len(tickers)} ETFs")
+    print(f"  ✓ Date range: {df.index[0].date()} to {df.index[-1].date()}")
+    print(f"  ✓ Total weeks: {len(df)}")
+    
+    return df, tickers
+
+
+# ================================
+# OPTIMIZATION RUNNER
+# ================================
+def _optimize_one(args):
+    """Run trend detection + optimization for one ticker (picklable for worker processes)"""
+    ticker, close_series, high_series, low_series = args
+    optimizer = ConstrainedFbisOptimizer(ticker, close_series, high_series, low_series)
+    return ticker, optimizer.optimize()
+
+
+def optimize_all_etfs(df, tickers):
+    """Run constrained optimization for all ETFs"""
+    print(f"\n🔍 Running CONSTRAINED BREAKOUT optimization for {len(tickers)} ETFs...")
+    print(f"   Method: Automatic trend detection + asset-class constraints")
+    print(f"   Breach penalty: {BREACH_PENALTY} (accepts breaches as signals)\n")
+
+    params = {}
+    jobs = []
+
+    for ticker in tickers:
+        close_col = f"{ticker}_close"
+        high_col = f"{ticker}_high"
+        low_col = f"{ticker}_low"
+
+        if close_col not in df.columns or high_col not in df.columns or low_col not in df.columns:
+            params[ticker] = {'period': 20, 'shift': -0.05, 'note': 'Missing data columns'}
+            continue
 
-.control-group input[type="range"]::-webkit-slider-thumb {
-    -webkit-appearance: none;
-    appearance: none;
-    width: 18px;
-    height: 18px;
-    border-radius: 50%;
-    background: #2a5298;
-    cursor: pointer;
-    box-shadow: 0 2px 4px rgba(42, 82, 152, 0.3);
-}
+        close_series = df[close_col].dropna()
+        high_series = df[high_col].dropna()
+        low_series = df[low_col].dropna()
 
-.control-group input[type="range"]::-webkit-slider-thumb:hover {
-    background: #1e3c72;
-    transform: scale(1.1);
-}
+        if len(close_series) < 52:
+            params[ticker] = {'period': 20, 'shift': -0.05, 'note': 'Less than 1 year of data'}
+            continue
 
-.control-group input[type="range"]::-moz-range-thumb {
-    width: 18px;
-    height: 18px;
-    border-radius: 50%;
-    background: #2a5298;
-    cursor: pointer;
-    border: none;
-    box-shadow: 0 2px 4px rgba(42, 82, 152, 0.3);
-}
+        jobs.append((ticker, close_series, high_series, low_series))
 
-.control-group input[type="range"]::-moz-range-thumb:hover {
-    background: #1e3c72;
-    transform: scale(1.1);
-}
+    # Each ticker's optimization is independent and CPU-bound, so fan the
+    # work out across cores; results come back keyed by ticker and are
+    # printed in the original order once everything has finished
+    results = {}
+    if jobs:
+        with ProcessPoolExecutor() as executor:
+            results = dict(executor.map(_optimize_one, jobs))
 
-.chart-display {
-    margin-top: 20px;
-    background: white;
-    border-radius: 8px;
-    padding: 15px;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-}
+    for idx, ticker in enumerate(tickers, 1):
+        print(f"[{idx}/{len(tickers)}] {ticker}")
 
-.save-section {
-    position: fixed;
-    top: 100px;
-    right: 20px;
-    z-index: 1000;
-}
+        if ticker not in results:
+            print(f"  ⚠ Warning: {params[ticker].pop('note')}")
+            continue
 
-.save-btn {
-    padding: 14px 28px;
-    background: linear-gradient(135deg, #27ae60 0%, #2ecc71 100%);
-    color: white;
-    border: none;
-    border-radius: 8px;
-    font-size: 1.05rem;
-    font-weight: 600;
-    cursor: pointer;
-    box-shadow: 0 4px 12px rgba(39, 174, 96, 0.3);
-    transition: all 0.3s ease;
-    font-family: 'Inter', sans-serif;
-}
+        result = results[ticker]
+        asset_class = result.get('asset_class', 'unknown')
+        trend_start = result['trend_start'].strftime('%Y-%m-%d')
+        print(f"  Class: {asset_class} | Trend from: {trend_start}")
+        print(f"  EMA({result['period']}) shift={result['shift']:.3f} | Tests={result['tests']} Breaches={result['breaches']} Score={result['score']:.1f}")
 
-.save-btn:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 6px 16px rgba(39, 174, 96, 0.4);
-    background: linear-gradient(135deg, #229954 0%, #27ae60 100%);
-}
+        params[ticker] = {
+            'period': result['period'],
+            'shift': result['shift']
+        }
 
-@media (max-width: 768px) {
-    .hero h1 {
-        font-size: 2.5rem;
-    }
-    
-    .hero-subtitle {
-        font-size: 1.1rem;
-    }
-    
-    .chart-page-container {
-        padding: 30px 20px !important;
-    }
-    
-    .controls {
-        flex-direction: column;
-        gap: 20px;
-    }
-    
-    .nav-menu {
-        flex-direction: column;
-        gap: 10px;
-    }
-    
-    .dropdown-content {
-        position: static;
-        box-shadow: none;
-        background-color: #2c3e50;
-    }
-}"""
-    
-    html = f"""<!DOCTYPE html>
+    print(f"\n  ✓ Optimization complete for {len(params)} ETFs")
+    return params
+
+
+# Page shell compiled once at import; generate_html only substitutes
+# the stylesheet block and the chart-data script
+_PAGE_SHELL = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>SATID - Risk Level Setting</title>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <script src="https://cdn.plot.ly/plotly-2.26.0.min.js"></script>
-    <style>
-{satid_css}
-    </style>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
+    <!-- basic bundle: only scatter traces are drawn; deferred so the
+         ~1 MB fetch does not block parsing -->
+    <script defer src="https://cdn.plot.ly/plotly-basic-2.26.0.min.js"></script>
+    ${css_block}
 </head>
 <body>
     <!-- Save Button -->
@@ -974,57 +915,277 @@ footer p {
         <div class="chart-page-container">
     
     <script>
-    {chart_data_js}
-    
+    ${chart_data_js}
+
+    // Decode the base64 float32 price arrays into typed arrays once
+    function decodeF32(b64) {
+        const bin = atob(b64);
+        const u8 = new Uint8Array(bin.length);
+        for (let i = 0; i < bin.length; i++) u8[i] = bin.charCodeAt(i);
+        return new Float32Array(u8.buffer);
+    }
+    for (const t in chartData) {
+        chartData[t].close = decodeF32(chartData[t].close_b64);
+        delete chartData[t].close_b64;
+    }
+
+    // Current slider values per ticker; one Map instead of dynamic
+    // window['current_*_TICKER'] globals
+    const satidState = new Map();
+
+    // Coalesce bursts of input events to one call per animation frame;
+    // a fast drag fires far more often than the chart can repaint
+    function rafDebounce(fn) {
+        let pending = false;
+        return () => {
+            if (pending) return;
+            pending = true;
+            requestAnimationFrame(() => { pending = false; fn(); });
+        };
+    }
+
     // Calculate EMA
-    function calculateEMA(data, period) {{
+    function calculateEMA(data, period) {
         const k = 2 / (period + 1);
-        const ema = [data[0]];
-        
-        for (let i = 1; i < data.length; i++) {{
-            ema.push(data[i] * k + ema[i - 1] * (1 - k));
-        }}
-        
+        const oneMinusK = 1 - k;
+        // Preallocated typed array: no per-push growth, and Plotly
+        // consumes typed arrays directly
+        const ema = new Float64Array(data.length);
+        ema[0] = data[0];
+
+        for (let i = 1; i < data.length; i++) {
+            ema[i] = data[i] * k + ema[i - 1] * oneMinusK;
+        }
+
         return ema;
-    }}
-    
+    }
+
+    // Wire up one chart section; shared by every ticker so the big
+    // update routine is parsed once instead of inlined per chart
+    function initChartSection(ticker, defaultPeriod, defaultShift) {
+        const chartDiv = document.getElementById(ticker + '_chart');
+        const periodSlider = document.getElementById(ticker + '_period');
+        const shiftSlider = document.getElementById(ticker + '_shift');
+        const periodValue = document.getElementById(ticker + '_period_value');
+        const shiftValue = document.getElementById(ticker + '_shift_value');
+
+        // Store current values for saving
+        satidState.set(ticker, {period: defaultPeriod, shift: defaultShift});
+
+        // EMA curves per period, computed on first use; shift-only
+        // drags then reduce to a lookup plus one multiply pass
+        const emaCache = new Map();
+
+        function updateChart() {
+            const period = parseInt(periodSlider.value);
+            const shift = parseFloat(shiftSlider.value) / 100;
+
+            periodValue.textContent = period;
+            shiftValue.textContent = (shift * 100).toFixed(1) + '%';
+
+            satidState.set(ticker, {period: period, shift: shift});
+
+            const dates = chartData[ticker].dates;
+            const close = chartData[ticker].close;
+            let ema = emaCache.get(period);
+            if (!ema) {
+                ema = calculateEMA(close, period);
+                emaCache.set(period, ema);
+            }
+            const fbis = ema.map(e => e * (1 + shift));
+
+            // Filter data for chart display (from January 2020)
+            const chartStartIdx = dates.findIndex(d => d >= '2020-01-01');
+            const displayDates = dates.slice(chartStartIdx);
+            const displayClose = close.slice(chartStartIdx);
+
+            // Filter Fbis line (from September 2022)
+            const fbisStartIdx = dates.findIndex(d => d >= '2022-09-01');
+            const fbisDates = dates.slice(fbisStartIdx);
+            const displayFbis = fbis.slice(fbisStartIdx);
+
+            const traces = [
+                {
+                    x: displayDates,
+                    y: displayClose,
+                    name: 'Price',
+                    type: 'scatter',
+                    line: { color: 'black', width: 2.5 }
+                },
+                {
+                    x: fbisDates,
+                    y: displayFbis,
+                    name: `Fbis (EMA$${period} $${(shift*100).toFixed(1)}%)`,
+                    type: 'scatter',
+                    line: { color: 'red', width: 2, dash: 'dot' }
+                }
+            ];
+
+            const layout = {
+                title: `$${ticker} - Adjustable Support (EMA$${period} @ $${(shift*100).toFixed(1)}%)`,
+                xaxis: { title: 'Date', type: 'date' },
+                yaxis: { title: 'Price ($$)' },
+                hovermode: 'x unified',
+                showlegend: true,
+                legend: { x: 0, y: 1 },
+                height: 480,
+                margin: { l: 60, r: 30, t: 40, b: 40 }
+            };
+
+            Plotly.newPlot(chartDiv, traces, layout, {responsive: true});
+        }
+
+        const updateDebounced = rafDebounce(updateChart);
+        periodSlider.addEventListener('input', updateDebounced);
+        shiftSlider.addEventListener('input', updateDebounced);
+
+        // Plotly is deferred, so hold the first draw until it has run;
+        // deferred scripts finish before DOMContentLoaded fires
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', updateChart);
+        } else {
+            updateChart();
+        }
+    }
+
     // Save all parameters to JSON
-    function saveAllParameters() {{
-        const params = {{}};
-        const tickers = Object.keys(chartData);
-        
-        for (let ticker of tickers) {{
-            const period = window['current_period_' + ticker];
-            const shift = window['current_shift_' + ticker];
-            
-            params[ticker] = {{
+    function saveAllParameters() {
+        const params = {};
+        for (const [ticker, {period, shift}] of satidState) {
+            params[ticker] = {
                 period: period,
                 shift: parseFloat(shift.toFixed(4))
-            }};
-        }}
+            };
+        }
         
-        const jsonStr = JSON.stringify(params, null, 2);
-        const blob = new Blob([jsonStr], {{ type: 'application/json' }});
+        // Compact output: the file is read back by scripts, not people
+        const jsonStr = JSON.stringify(params);
+        const blob = new Blob([jsonStr], { type: 'application/json' });
         const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
+        // One hidden anchor reused across saves instead of a fresh
+        // create/append/remove cycle per click
+        const a = window._satidSaveAnchor ||= Object.assign(
+            document.body.appendChild(document.createElement('a')),
+            {style: 'display:none'});
         a.href = url;
         a.download = 'SATID_Fbis_Optimized_Parameters.json';
-        document.body.appendChild(a);
         a.click();
-        document.body.removeChild(a);
-        URL.revokeObjectURL(url);
+        setTimeout(() => URL.revokeObjectURL(url), 0);
         
         alert('✅ Parameters saved!\\n\\nFile: SATID_Fbis_Optimized_Parameters.json\\n\\nPlace this file in your SATID folder.');
-    }}
+    }
     </script>
+""")
+
+
+# ================================
+# CHART DATA GENERATION
+# ================================
+def generate_chart_data_js(df, valid_tickers, params):
+    """Generate JavaScript with all chart data (tickers pre-filtered)"""
+
+    print(f"\n📈 Generating chart data for {len(valid_tickers)} ETFs...")
+
+    # Build plain dicts and serialize each object once with compact
+    # separators - no per-ticker string concatenation, and the emitted
+    # JSON is ~30% smaller than the pretty-printed fragments
+    chart_data = {}
+    opt_params = {}
+
+    for ticker in valid_tickers:
+        prices = df[ticker + "_close"].dropna()
+        # Prices travel as base64 float32 (~6 bytes/value vs ~18 as
+        # JSON text) and decode straight into a typed array client-side
+        close = np.ascontiguousarray(prices.to_numpy(), dtype=np.float32)
+        chart_data[ticker] = {
+            'dates': prices.index.strftime('%Y-%m-%d').tolist(),
+            'close_b64': base64.b64encode(close.tobytes()).decode('ascii')
+        }
+        opt_params[ticker] = {
+            'period': params.get(ticker, {}).get('period', 20),
+            'shift': params.get(ticker, {}).get('shift', -0.05)
+        }
+
+    buf = io.StringIO()
+    buf.write("// Chart data for all ETFs\n")
+    buf.write("const chartData = ")
+    buf.write(json.dumps(chart_data, separators=(',', ':')))
+    buf.write(";\nconst optimizedParams = ")
+    buf.write(json.dumps(opt_params, separators=(',', ':')))
+    buf.write(";\n")
+
+    print(f"  ✓ Generated chart data")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=256)
+def _build_chart_section(ticker, period, shift):
+    """Render one chart section; pure in its scalar arguments, so cached"""
+    shift_pct = shift * 100
+
+    html = f"""
+    <!-- {ticker} Chart -->
+    <div class="chart-section">
+        <h2>{ticker}</h2>
+        
+        <div class="controls">
+            <div class="control-group">
+                <label for="{ticker}_period">EMA Period: <span id="{ticker}_period_value">{period}</span></label>
+                <input type="range" id="{ticker}_period" min="8" max="50" value="{period}" step="1">
+            </div>
+            
+            <div class="control-group">
+                <label for="{ticker}_shift">Vertical Shift: <span id="{ticker}_shift_value">{shift_pct:.1f}%</span></label>
+                <input type="range" id="{ticker}_shift" min="-20" max="5" value="{shift_pct:.1f}" step="0.1">
+            </div>
+        </div>
+        
+        <div id="{ticker}_chart" class="chart-display"></div>
+    </div>
+
+    <script>initChartSection('{ticker}', {period}, {shift});</script>
 """
-    
+
+    return html
+
+
+def generate_chart_html(ticker, params):
+    """Generate HTML for a single chart with controls"""
+    p = params.get(ticker, {})
+    return _build_chart_section(ticker, p.get('period', 20), p.get('shift', -0.05))
+
+
+# ================================
+# HTML GENERATION
+# ================================
+def iter_html(df, tickers, params):
+    """Yield the standalone HTML page fragment by fragment"""
+
+    print(f"\n🔨 Generating HTML...")
+
+    # Filter once against a set of column names instead of probing the
+    # Index with a fresh f-string per ticker in every loop below
+    cols = frozenset(df.columns)
+    valid_tickers = [t for t in tickers if (t + "_close") in cols]
+
+    chart_data_js = generate_chart_data_js(df, valid_tickers, params)
+
+
+    # Shared stylesheet: link the sibling satid.css (written by main, so
+    # the browser caches it across SATID pages) unless single-file
+    # delivery is wanted
+    if INLINE_CSS:
+        css_block = f"<style>\n{SATID_CSS}\n    </style>"
+    else:
+        css_block = f'<link rel="stylesheet" href="{CSS_FILE}">'
+
+    yield _PAGE_SHELL.substitute(css_block=css_block, chart_data_js=chart_data_js)
+
     # Generate chart HTML for each ticker
-    for ticker in tickers:
-        if f"{ticker}_close" in df.columns:
-            html += generate_chart_html(ticker, params)
-    
-    html += """
+    for ticker in valid_tickers:
+        yield generate_chart_html(ticker, params)
+
+    yield """
         </div>
     </div>
 
@@ -1034,10 +1195,39 @@ footer p {
     </footer>
 </body>
 </html>"""
-    
+
     print(f"  ✓ Generated HTML with {len(tickers)} charts")
-    
-    return html
+
+
+def generate_html(df, tickers, params):
+    """Build the whole page as one string (main streams iter_html instead)"""
+    return ''.join(iter_html(df, tickers, params))
+
+
+def write_compressed_copies(path):
+    """Emit .gz (and .br when brotli is available) siblings of the page
+
+    The page is mostly repeating text and compresses roughly 10x; a
+    static server can pick the pre-compressed copy up directly instead
+    of compressing per request.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    with gzip.open(path + '.gz', 'wb', compresslevel=9) as g:
+        g.write(data)
+    sizes = f"{len(data) / 1024:.0f} KB → gz {os.path.getsize(path + '.gz') / 1024:.0f} KB"
+
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        with open(path + '.br', 'wb') as b:
+            b.write(brotli.compress(data, quality=11))
+        sizes += f", br {os.path.getsize(path + '.br') / 1024:.0f} KB"
+
+    print(f"  ✓ Compressed copies: {sizes}")
 
 
 # ================================
@@ -1058,16 +1248,50 @@ def main():
         params = optimize_all_etfs(df, tickers)
         
         # Save parameters to JSON
-        with open(PARAMS_FILE, 'w') as f:
-            json.dump(params, f, indent=2)
+        with open(PARAMS_FILE, 'wb') as f:
+            f.write(orjson.dumps(params, option=orjson.OPT_INDENT_2))
         print(f"\n💾 Saved optimized parameters to: {PARAMS_FILE}")
         
-        # Generate HTML
-        html = generate_html(df, tickers, params)
-        
-        # Save HTML
-        with open(OUTPUT_HTML, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # The page only depends on the CSV and the optimized parameters,
+        # but other generators also write OUTPUT_HTML - so the cached
+        # fingerprint additionally covers the page currently on disk,
+        # and a run is only skipped when that page is our own output
+        cache_key = hashlib.blake2b(
+            (str(os.path.getmtime(CSV_FILE)) + json.dumps(params, sort_keys=True)).encode(),
+            digest_size=16).hexdigest()
+
+        def _html_digest():
+            try:
+                with open(OUTPUT_HTML, 'rb') as f:
+                    return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            except FileNotFoundError:
+                return None
+
+        try:
+            with open(CACHE_FILE) as f:
+                cached_key, _, cached_html = f.read().strip().partition(' ')
+        except FileNotFoundError:
+            cached_key = cached_html = None
+
+        if cache_key == cached_key and _html_digest() == cached_html:
+            print(f"\n✓ {OUTPUT_HTML} is up to date - skipping HTML generation")
+        else:
+            # Generate and save HTML - fragments stream straight into a
+            # wide write buffer, so the full page never sits in memory
+            with open(OUTPUT_HTML, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.writelines(iter_html(df, tickers, params))
+
+            write_compressed_copies(OUTPUT_HTML)
+
+            # The stylesheet belongs to this page; write it in the same
+            # branch so a skipped run can never clobber another page's CSS
+            if not INLINE_CSS:
+                with open(CSS_FILE, 'w', encoding='utf-8') as f:
+                    f.write(SATID_CSS)
+                print(f"  ✓ Stylesheet: {CSS_FILE}")
+
+            with open(CACHE_FILE, 'w') as f:
+                f.write(cache_key + ' ' + _html_digest())
         
         print("\n" + "=" * 80)
         print("✓ OPTIMIZATION COMPLETE!")
@@ -1094,7 +1318,6 @@ def main():
         print(f"  - {CSV_FILE}")
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 
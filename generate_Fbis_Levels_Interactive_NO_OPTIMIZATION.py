@@ -23,9 +23,14 @@ Date: February 2026
 
 import pandas as pd
 import numpy as np
+import gzip
 import json
+import orjson
 from datetime import datetime
+from functools import lru_cache
+from numba import njit
 import os
+import traceback
 
 # ================================
 # CONFIGURATION
@@ -39,206 +44,13 @@ PRICE_START_DATE = "2020-01-01"
 FBIS_START_DATE = "2022-09-01"
 
 
-# ================================
-# DATA LOADING
-# ================================
-def load_etf_prices(filename):
-    """Load ETF data from CSV"""
-    print("Loading ETF price data...")
-    
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"Price data file not found: {filename}")
-    
-    df = pd.read_csv(filename, parse_dates=['Date'])
-    df = df.sort_values('Date')
-    df.set_index('Date', inplace=True)
-    
-    tickers = [col.replace('_close', '') for col in df.columns if col.endswith('_close')]
-    
-    print(f"  ✓ Loaded {len(df)} weeks of data")
-    print(f"  ✓ Date range: {df.index.min().date()} to {df.index.max().date()}")
-    print(f"  ✓ Found {len(tickers)} ETFs")
-    
-    return df, tickers
-
+# SATID Master CSS, written to a sibling file the page links; the
+# browser caches it once instead of re-downloading it inline. The name
+# is distinct from the optimizing generator's satid.css - the two pages
+# use different markup and each must keep its own stylesheet on disk
+CSS_FILE = "satid_full.css"
 
-def load_parameters(filename):
-    """Load optimized parameters from JSON file"""
-    print("\nLoading optimized parameters from JSON...")
-    
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"Parameters file not found: {filename}\n"
-                              f"Please run generate_Fbis_Levels_Interactive.py first to create it.")
-    
-    with open(filename, 'r') as f:
-        params = json.load(f)
-    
-    print(f"  ✓ Loaded parameters for {len(params)} ETFs")
-    
-    return params
-
-
-# ================================
-# HTML GENERATION
-# ================================
-def generate_chart_html(ticker, params):
-    """Generate HTML for individual ticker chart"""
-    
-    period = params[ticker]['period']
-    shift = params[ticker]['shift']
-    
-    html = f"""
-    <!-- {ticker} Chart -->
-    <div class="chart-container">
-        <div class="chart-header">
-            <h2>{ticker}</h2>
-        </div>
-        
-        <div class="controls">
-            <div class="control-group">
-                <label for="period_{ticker}">EMA Period: <span id="period_value_{ticker}">{period}</span></label>
-                <input type="range" id="period_{ticker}" min="12" max="36" value="{period}" 
-                       oninput="document.getElementById('period_value_{ticker}').textContent = this.value; 
-                                window['current_period_{ticker}'] = parseInt(this.value); 
-                                updateChart_{ticker}()">
-            </div>
-            
-            <div class="control-group">
-                <label for="shift_{ticker}">Vertical Shift: <span id="shift_value_{ticker}">{shift:.3f}</span></label>
-                <input type="range" id="shift_{ticker}" min="-0.15" max="0.05" step="0.005" value="{shift}"
-                       oninput="document.getElementById('shift_value_{ticker}').textContent = parseFloat(this.value).toFixed(3);
-                                window['current_shift_{ticker}'] = parseFloat(this.value);
-                                updateChart_{ticker}()">
-            </div>
-        </div>
-        
-        <div id="chart_{ticker}"></div>
-    </div>
-    
-    <script>
-    // Initialize current values
-    window['current_period_{ticker}'] = {period};
-    window['current_shift_{ticker}'] = {shift};
-    
-    function updateChart_{ticker}() {{
-        const data = chartData['{ticker}'];
-        const period = window['current_period_{ticker}'];
-        const shift = window['current_shift_{ticker}'];
-        
-        // Calculate EMA
-        const ema = calculateEMA(data.close, period);
-        
-        // Apply vertical shift
-        const fbis = ema.map(val => val * (1 + shift));
-        
-        // Filter data for display (price from 2020, Fbis from Sep 2022)
-        const priceStartIdx = data.date.findIndex(d => d >= '2020-01-01');
-        const fbisStartIdx = data.date.findIndex(d => d >= '2022-09-01');
-        
-        const traces = [
-            {{
-                x: data.date.slice(priceStartIdx),
-                y: data.close.slice(priceStartIdx),
-                type: 'scatter',
-                mode: 'lines',
-                name: '{ticker} Price',
-                line: {{ color: 'black', width: 2 }},
-                hovertemplate: '<b>{ticker}</b><br>Date: %{{x}}<br>Price: $%{{y:.2f}}<extra></extra>'
-            }},
-            {{
-                x: data.date.slice(fbisStartIdx),
-                y: fbis.slice(fbisStartIdx),
-                type: 'scatter',
-                mode: 'lines',
-                name: 'Fbis Support',
-                line: {{ color: 'red', width: 2, dash: 'dot' }},
-                hovertemplate: '<b>Fbis Support</b><br>Date: %{{x}}<br>Level: $%{{y:.2f}}<extra></extra>'
-            }}
-        ];
-        
-        const layout = {{
-            hovermode: 'x unified',
-            showlegend: true,
-            legend: {{
-                x: 0.02,
-                y: 0.98,
-                xanchor: 'left',
-                yanchor: 'top',
-                bgcolor: 'rgba(255, 255, 255, 0.9)',
-                bordercolor: '#34495e',
-                borderwidth: 1
-            }},
-            xaxis: {{
-                title: '',
-                gridcolor: '#ecf0f1',
-                showgrid: true
-            }},
-            yaxis: {{
-                title: 'Price ($)',
-                gridcolor: '#ecf0f1',
-                showgrid: true,
-                tickformat: '$.2f'
-            }},
-            plot_bgcolor: 'white',
-            paper_bgcolor: 'white',
-            margin: {{ t: 20, r: 20, b: 40, l: 60 }},
-            height: 400
-        }};
-        
-        const config = {{
-            responsive: true,
-            displayModeBar: true,
-            displaylogo: false,
-            modeBarButtonsToRemove: ['select2d', 'lasso2d', 'autoScale2d']
-        }};
-        
-        Plotly.newPlot('chart_{ticker}', traces, layout, config);
-    }}
-    
-    // Initial render
-    updateChart_{ticker}();
-    </script>
-    """
-    
-    return html
-
-
-def generate_chart_data_js(df, tickers):
-    """Generate JavaScript object with chart data for all tickers"""
-    
-    js_data = "const chartData = {\n"
-    
-    for ticker in tickers:
-        if f"{ticker}_close" in df.columns:
-            dates = [d.strftime('%Y-%m-%d') for d in df.index]
-            closes = df[f"{ticker}_close"].tolist()
-            
-            js_data += f"    '{ticker}': {{\n"
-            js_data += f"        date: {json.dumps(dates)},\n"
-            js_data += f"        close: {json.dumps(closes)}\n"
-            js_data += f"    }},\n"
-    
-    js_data += "};\n"
-    
-    return js_data
-
-
-def generate_html(df, tickers, params):
-    """Generate complete HTML dashboard"""
-    
-    print("\nGenerating interactive HTML dashboard...")
-    
-    # Validate that all tickers have parameters
-    missing_params = [t for t in tickers if t not in params]
-    if missing_params:
-        print(f"  ⚠ WARNING: Missing parameters for: {', '.join(missing_params)}")
-        tickers = [t for t in tickers if t in params]
-    
-    # Generate JavaScript data
-    chart_data_js = generate_chart_data_js(df, tickers)
-    
-    # SATID Master CSS
-    satid_css = """/* ============================================
+SATID_CSS = """/* ============================================
    SATID Website - COMPLETE MASTER STYLESHEET
    Merged from index-enhanced-8-3-2.html + styles.css
    This is the DEFINITIVE version with ALL styling
@@ -911,8 +723,201 @@ footer p {
 .mt-40 {
     margin-top: 40px;
 }"""
+
+
+# ================================
+# DATA LOADING
+# ================================
+def _mtime_cache(fn):
+    """Cache a loader on (path, mtime) so repeated runs in one session
+    (watch loops, notebooks) skip the disk read and parse"""
+    cache = {}
+
+    def wrapper(path):
+        key = (path, os.path.getmtime(path)) if os.path.exists(path) else None
+        if key in cache:
+            return cache[key]
+        result = fn(path)
+        if key is not None:
+            cache[key] = result
+        return result
+
+    return wrapper
+
+
+@_mtime_cache
+def load_etf_prices(filename):
+    """Load ETF data from CSV"""
+    print("Loading ETF price data...")
+    
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"Price data file not found: {filename}")
+    
+    df = pd.read_csv(filename, index_col='Date')
+
+    # The CSV stores mixed-offset timestamps; normalize to a naive
+    # DatetimeIndex (searchsorted below needs datetime64)
+    df.index = pd.to_datetime(df.index, utc=True).tz_localize(None)
+    df = df.sort_index()
+
+    tickers = [col.replace('_close', '') for col in df.columns if col.endswith('_close')]
+    
+    print(f"  ✓ Loaded {len(df)} weeks of data")
+    print(f"  ✓ Date range: {df.index.min().date()} to {df.index.max().date()}")
+    print(f"  ✓ Found {len(tickers)} ETFs")
+    
+    return df, tickers
+
+
+@_mtime_cache
+def load_parameters(filename):
+    """Load optimized parameters from JSON file"""
+    print("\nLoading optimized parameters from JSON...")
+    
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"Parameters file not found: {filename}\n"
+                              f"Please run generate_Fbis_Levels_Interactive.py first to create it.")
+    
+    with open(filename, 'r') as f:
+        params = json.load(f)
+    
+    print(f"  ✓ Loaded parameters for {len(params)} ETFs")
+    
+    return params
+
+
+# ================================
+# HTML GENERATION
+# ================================
+# One shared chart-section template resolved per ticker with .format;
+# the f-string literal was re-parsed on every call
+_CHART_TEMPLATE = """
+    <!-- {ticker} Chart -->
+    <div class="chart-container">
+        <div class="chart-header">
+            <h2>{ticker}</h2>
+        </div>
+        
+        <div class="controls">
+            <div class="control-group">
+                <label for="period_{ticker}">EMA Period: <span id="period_value_{ticker}">{period}</span></label>
+                <input type="range" id="period_{ticker}" min="12" max="36" value="{period}" 
+                       oninput="document.getElementById('period_value_{ticker}').textContent = this.value;
+                                chartData['{ticker}'].period = parseInt(this.value);
+                                scheduleUpdate('{ticker}')">
+            </div>
+            
+            <div class="control-group">
+                <label for="shift_{ticker}">Vertical Shift: <span id="shift_value_{ticker}">{shift_fmt}</span></label>
+                <input type="range" id="shift_{ticker}" min="-0.15" max="0.05" step="0.005" value="{shift}"
+                       oninput="document.getElementById('shift_value_{ticker}').textContent = parseFloat(this.value).toFixed(3);
+                                chartData['{ticker}'].shift = parseFloat(this.value);
+                                scheduleUpdate('{ticker}')">
+            </div>
+        </div>
+        
+        <div id="chart_{ticker}"></div>
+    </div>
     
-    html = f"""<!DOCTYPE html>
+    <script>updateChart('{ticker}', false);</script>
+    """
+
+
+@lru_cache(maxsize=256)
+def _chart_html_cached(ticker, period, shift):
+    """Fill the chart template for one (ticker, period, shift) tuple;
+    memoized so reruns with unchanged parameters skip the formatting"""
+    # format_map with the display value pre-formatted: the template's
+    # plain {name} slots need no per-call format-spec parsing
+    return _CHART_TEMPLATE.format_map({'ticker': ticker,
+                                       'period': period,
+                                       'shift': shift,
+                                       'shift_fmt': f"{shift:.3f}"})
+
+
+def generate_chart_html(ticker, params):
+    """Generate HTML for individual ticker chart"""
+    return _chart_html_cached(ticker, params[ticker]['period'],
+                              params[ticker]['shift'])
+
+
+@njit(cache=True, fastmath=True)
+def ema_numba(x, period):
+    """EMA recurrence ema[i] = k*x[i] + (1-k)*ema[i-1] as a compiled loop"""
+    k = 2.0 / (period + 1.0)
+    out = np.empty_like(x)
+    out[0] = x[0]
+    for i in range(1, x.shape[0]):
+        out[i] = k * x[i] + (1.0 - k) * out[i - 1]
+    return out
+
+
+def generate_chart_data_js(df, tickers, params):
+    """Generate JavaScript object with chart data for all tickers
+
+    The default-parameter Fbis line is precomputed here (EMA seeded from
+    the full history), so the browser renders without a JS EMA pass and
+    only the displayed date ranges are serialized.
+    """
+
+    idx = df.index.values
+    price_start = int(np.searchsorted(idx, np.datetime64(PRICE_START_DATE)))
+    fbis_start = int(np.searchsorted(idx, np.datetime64(FBIS_START_DATE)))
+
+    # Every ticker shares the index, so format the dates once instead
+    # of once per ticker
+    dates_iso = df.index[price_start:].strftime('%Y-%m-%d').tolist()
+
+    # One dict serialized in a single C-level encode with compact
+    # separators - no quadratic += string growth, ~15% fewer bytes
+    payload = {}
+
+    for ticker in tickers:
+        close_full = df[f"{ticker}_close"].to_numpy(dtype=np.float64)
+
+        ema = ema_numba(close_full, params[ticker]['period'])
+        fbis = ema * (1 + params[ticker]['shift'])
+        # 3 decimals instead of full float64 repr: ~7 chars per
+        # value rather than up to 17, far below what a chart shows
+        payload[ticker] = {
+            'date': dates_iso,
+            'close': np.round(close_full[price_start:], 3),
+            'fbis_default': np.round(fbis[fbis_start:], 3),
+            'period': params[ticker]['period'],
+            'shift': params[ticker]['shift']
+        }
+
+    # The index is shared, so the Fbis display offset is one constant
+    # for every chart; the browser needs no per-update findIndex scan.
+    # orjson serializes the ndarrays directly (no tolist pass) and is
+    # compact by default
+    chart_json = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return (f"const chartData = {chart_json};\n"
+            f"    const FBIS_START_IDX = {fbis_start - price_start};\n")
+
+
+def write_html(f, df, tickers, params):
+    """Write the dashboard to an open file handle, section by section;
+    the full document never has to exist as one string in memory"""
+
+    print("\nGenerating interactive HTML dashboard...")
+    
+    # Validate that all tickers have parameters
+    missing_params = [t for t in tickers if t not in params]
+    if missing_params:
+        print(f"  ⚠ WARNING: Missing parameters for: {', '.join(missing_params)}")
+        tickers = [t for t in tickers if t in params]
+
+    # Resolve the usable tickers once; membership tests against an Index
+    # are linear scans, and the same check used to run in two places
+    cols = frozenset(df.columns)
+    valid_tickers = [t for t in tickers if (t + "_close") in cols]
+
+    # Generate JavaScript data
+    chart_data_js = generate_chart_data_js(df, valid_tickers, params)
+    
+    
+    f.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <!-- Google tag (gtag.js) -->
@@ -929,9 +934,7 @@ footer p {
     <title>SATID - Risk Level Setting</title>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
     <script src="https://cdn.plot.ly/plotly-2.26.0.min.js"></script>
-    <style>
-{satid_css}
-    </style>
+    <link rel="stylesheet" href="{CSS_FILE}">
 </head>
 <body>
     <!-- Save Button -->
@@ -985,27 +988,147 @@ footer p {
     <script>
     {chart_data_js}
     
-    // Calculate EMA
+    // Calculate EMA into a preallocated typed array; no per-push
+    // growth and V8 keeps the loop monomorphic
     function calculateEMA(data, period) {{
         const k = 2 / (period + 1);
-        const ema = [data[0]];
-        
+        const oneMinusK = 1 - k;
+        const ema = new Float64Array(data.length);
+        ema[0] = data[0];
+
         for (let i = 1; i < data.length; i++) {{
-            ema.push(data[i] * k + ema[i - 1] * (1 - k));
+            ema[i] = data[i] * k + ema[i - 1] * oneMinusK;
         }}
-        
+
         return ema;
     }}
-    
+
+    // Hydrate once at load: typed close arrays (Plotly skips its
+    // coercion pass on them) and the constant Fbis date view, so
+    // updateChart never slices fresh copies per redraw
+    for (const t in chartData) {{
+        const d = chartData[t];
+        d.close = Float64Array.from(d.close);
+        d.fbisDates = d.date.slice(FBIS_START_IDX);
+    }}
+
+    // EMA curves memoized per (ticker, period); the EMA is independent
+    // of shift, so shift-slider scrubs reuse the cached curve
+    const emaCache = {{}};
+
+    // Coalesce slider event bursts to one redraw per animation frame;
+    // a fast drag fires far more often than the chart can repaint
+    const updatePending = new Set();
+    function scheduleUpdate(ticker) {{
+        if (updatePending.has(ticker)) return;
+        updatePending.add(ticker);
+        requestAnimationFrame(() => {{
+            updatePending.delete(ticker);
+            updateChart(ticker, true);
+        }});
+    }}
+
+    // One shared update routine for every ticker; state lives on the
+    // chartData entries instead of per-ticker globals and closures
+    function updateChart(ticker, recompute) {{
+        const data = chartData[ticker];
+
+        // Fbis starts Sep 2022; the arrays themselves start Jan 2020
+        // and the offset is precomputed server-side
+        const fbisStartIdx = FBIS_START_IDX;
+
+        // Initial render uses the server-computed default line; the
+        // EMA is only recomputed once a slider actually moves
+        let fbis;
+        if (recompute) {{
+            const key = ticker + ':' + data.period;
+            let ema = emaCache[key];
+            if (!ema) {{
+                ema = calculateEMA(data.close, data.period);
+                emaCache[key] = ema;
+            }}
+            // Scale only the displayed range in one typed-array pass
+            // instead of map-over-everything plus a slice copy
+            const s = 1 + data.shift;
+            fbis = new Float64Array(ema.length - fbisStartIdx);
+            for (let i = 0; i < fbis.length; i++) {{
+                fbis[i] = ema[fbisStartIdx + i] * s;
+            }}
+        }} else {{
+            fbis = data.fbis_default;
+        }}
+
+        const traces = [
+            {{
+                x: data.date,
+                y: data.close,
+                type: 'scatter',
+                mode: 'lines',
+                name: ticker + ' Price',
+                line: {{ color: 'black', width: 2 }},
+                hovertemplate: '<b>' + ticker + '</b><br>Date: %{{x}}<br>Price: $%{{y:.2f}}<extra></extra>'
+            }},
+            {{
+                x: data.fbisDates,
+                y: fbis,
+                type: 'scatter',
+                mode: 'lines',
+                name: 'Fbis Support',
+                line: {{ color: 'red', width: 2, dash: 'dot' }},
+                hovertemplate: '<b>Fbis Support</b><br>Date: %{{x}}<br>Level: $%{{y:.2f}}<extra></extra>'
+            }}
+        ];
+
+        const layout = {{
+            hovermode: 'x unified',
+            showlegend: true,
+            legend: {{
+                x: 0.02,
+                y: 0.98,
+                xanchor: 'left',
+                yanchor: 'top',
+                bgcolor: 'rgba(255, 255, 255, 0.9)',
+                bordercolor: '#34495e',
+                borderwidth: 1
+            }},
+            xaxis: {{
+                title: '',
+                gridcolor: '#ecf0f1',
+                showgrid: true
+            }},
+            yaxis: {{
+                title: 'Price ($)',
+                gridcolor: '#ecf0f1',
+                showgrid: true,
+                tickformat: '$.2f'
+            }},
+            plot_bgcolor: 'white',
+            paper_bgcolor: 'white',
+            margin: {{ t: 20, r: 20, b: 40, l: 60 }},
+            height: 400
+        }};
+
+        const config = {{
+            responsive: true,
+            displayModeBar: true,
+            displaylogo: false,
+            modeBarButtonsToRemove: ['select2d', 'lasso2d', 'autoScale2d']
+        }};
+
+        // react diffs against the existing plot instead of tearing the
+        // SVG down and rebuilding it like newPlot
+        Plotly.react('chart_' + ticker, traces, layout, config);
+    }}
+
     // Save all parameters to JSON
     function saveAllParameters() {{
         const params = {{}};
         const tickers = Object.keys(chartData);
-        
+
         for (let ticker of tickers) {{
-            const period = window['current_period_' + ticker];
-            const shift = window['current_shift_' + ticker];
-            
+            const period = chartData[ticker].period;
+            const shift = chartData[ticker].shift;
+
             params[ticker] = {{
                 period: period,
                 shift: parseFloat(shift.toFixed(4))
@@ -1026,14 +1149,13 @@ footer p {
         alert('✅ Parameters saved!\\n\\nFile: SATID_Fbis_Optimized_Parameters.json\\n\\nPlace this file in your SATID folder.');
     }}
     </script>
-"""
-    
+""")
+
     # Generate chart HTML for each ticker
-    for ticker in tickers:
-        if f"{ticker}_close" in df.columns:
-            html += generate_chart_html(ticker, params)
-    
-    html += """
+    for ticker in valid_tickers:
+        f.write(generate_chart_html(ticker, params))
+
+    f.write("""
         </div>
     </div>
 
@@ -1042,11 +1164,9 @@ footer p {
         <p>&copy; 2024 SATID Investment Management. All rights reserved.</p>
     </footer>
 </body>
-</html>"""
-    
-    print(f"  ✓ Generated HTML with {len(tickers)} charts")
-    
-    return html
+</html>""")
+
+    print(f"  ✓ Generated HTML with {len(valid_tickers)} charts")
 
 
 # ================================
@@ -1069,13 +1189,27 @@ def main():
         # Load existing parameters (NO OPTIMIZATION)
         params = load_parameters(PARAMS_FILE)
         
-        # Generate HTML
-        html = generate_html(df, tickers, params)
-        
-        # Save HTML
-        with open(OUTPUT_HTML, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
+        # Generate and save HTML, streaming sections to disk
+        with open(OUTPUT_HTML, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            write_html(f, df, tickers, params)
+
+        # Pre-compressed copy a static server can ship directly; the
+        # page is repetitive text and compresses roughly 5x
+        with open(OUTPUT_HTML, 'rb') as f:
+            encoded = f.read()
+        with gzip.open(OUTPUT_HTML + '.gz', 'wb', compresslevel=9) as g:
+            g.write(encoded)
+        try:
+            import brotli
+        except ImportError:
+            pass
+        else:
+            with open(OUTPUT_HTML + '.br', 'wb') as b:
+                b.write(brotli.compress(encoded, quality=11))
+
+        with open(CSS_FILE, 'w', encoding='utf-8') as f:
+            f.write(SATID_CSS)
+
         print("\n" + "=" * 80)
         print("✓ GENERATION COMPLETE!")
         print("=" * 80)
@@ -1100,7 +1234,6 @@ def main():
         print(f"  - {PARAMS_FILE} (optimized parameters)")
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
-        import traceback
         traceback.print_exc()
 
 
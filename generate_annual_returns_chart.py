@@ -4,112 +4,20 @@ Table View + Bar Chart View
 """
 
 import pandas as pd
-import json
+import numpy as np
+import orjson
+import os
+import pyarrow.csv as pacsv
+from string import Template
 
-def main():
-    print("=" * 70)
-    print("ANNUAL RETURNS CHART WITH TABS")
-    print("=" * 70)
-    
-    # Load data
-    print("\nLoading data...")
-    prices = pd.read_csv('etf_prices_monthly.csv', index_col=0)
-    prices.index = pd.to_datetime(prices.index, utc=True).tz_localize(None)
-    
-    with open('portfolio_calculations_monthly.json', 'r') as f:
-        portfolios = json.load(f)
-    
-    print(f"✓ Data loaded successfully")
-    
-    # Asset classes
-    asset_classes = {
-        'Cash': ['BIL'],
-        'Fixed Income': ['SHY', 'IGSB', 'IGIB', 'LQD', 'SHYG', 'HYG', 'EMB', 'CEMB'],
-        'Equity': ['SPY', 'QQQ', 'IJK', 'IWM', 'VGK', 'EWU', 'EWJ', 'EEM', 'AAXJ', 'MCHI', 'INDA'],
-        'Alternative Investments': ['GLD', 'FTLS', 'QAI', 'WTMF']
-    }
-    
-    colors = {
-        'Cash': '#90EE90',
-        'Fixed Income': '#4169E1',
-        'Equity': '#FF6B6B',
-        'Alternative Investments': '#FFD700',
-        'Conservative Income': '#505050',
-        'Conservative Balanced': '#707070',
-        'Balanced Portfolio': '#909090',
-        'Growth Portfolio': '#A8A8A8',
-        'Aggressive Growth Portfolio': '#C0C0C0'
-    }
-    
-    # Calculate returns
-    print("Calculating returns...")
-    years = [y for y in sorted(prices.index.year.unique()) if y >= 2015]
-    
-    # Asset class returns
-    ac_returns = {}
-    for ac_name, etf_list in asset_classes.items():
-        valid_etfs = [e for e in etf_list if e in prices.columns]
-        if not valid_etfs:
-            continue
-        
-        returns = []
-        for year in years:
-            year_data = prices[prices.index.year == year][valid_etfs]
-            if len(year_data) >= 2:
-                ret = ((year_data.iloc[-1] / year_data.iloc[0]) - 1).mean() * 100
-                returns.append(round(ret, 2))
-        
-        # YTD
-        latest_year = max(years)
-        ytd_data = prices[prices.index.year == latest_year][valid_etfs]
-        if len(ytd_data) >= 2:
-            ytd_ret = ((ytd_data.iloc[-1] / ytd_data.iloc[0]) - 1).mean() * 100
-            returns.append(round(ytd_ret, 2))
-        
-        ac_returns[ac_name] = returns
-    
-    # Portfolio returns  
-    port_returns = {}
-    for port_name, port_data in portfolios.items():
-        allocations = port_data['allocations']
-        returns = []
-        
-        for year in years:
-            year_prices = prices[prices.index.year == year]
-            if len(year_prices) >= 2:
-                year_rets = year_prices.pct_change().dropna()
-                port_ret = sum(year_rets[etf].sum() * weight 
-                             for etf, weight in allocations.items() 
-                             if etf in year_rets.columns)
-                returns.append(round(port_ret * 100, 2))
-        
-        # YTD
-        latest_year = max(years)
-        ytd_prices = prices[prices.index.year == latest_year]
-        if len(ytd_prices) >= 2:
-            ytd_rets = ytd_prices.pct_change().dropna()
-            port_ret = sum(ytd_rets[etf].sum() * weight 
-                         for etf, weight in allocations.items() 
-                         if etf in ytd_rets.columns)
-            returns.append(round(port_ret * 100, 2))
-        
-        port_returns[port_name] = returns
-    
-    year_labels = [str(y) for y in years] + ['YTD']
-    
-    # Find min/max for chart scaling
-    all_values = []
-    for vals in ac_returns.values():
-        all_values.extend(vals)
-    for vals in port_returns.values():
-        all_values.extend(vals)
-    y_max = max(max(all_values), abs(min(all_values)))  # Make symmetric
-    
-    print("✓ Returns calculated")
-    print("Generating HTML with tabs...")
-    
-    # Generate HTML
-    html = """<!DOCTYPE html>
+PRICES_CSV = 'etf_prices_monthly.csv'
+PRICES_FEATHER = 'etf_prices_monthly.feather'
+
+# The document shell - head, styles, controls, view scaffolding and the
+# client script - never changes; build the Template once at import and
+# substitute only the generated fragments. The JS ${idx} interpolation
+# is escaped as $$.
+_PAGE_SHELL = Template("""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -212,13 +120,7 @@ def main():
             <div class="section">
                 <h3>Portfolio Profiles</h3>
                 <div class="buttons">
-"""
-    
-    port_names = list(port_returns.keys())
-    for i, name in enumerate(port_names):
-        html += f'                    <button onclick="togglePort({i})">{name}</button>\n'
-    
-    html += """                </div>
+$buttons                </div>
             </div>
         </div>
         
@@ -233,33 +135,10 @@ def main():
                 <thead>
                     <tr>
                         <th>Category</th>
-"""
-    
-    for year in year_labels:
-        html += f'                        <th>{year}</th>\n'
-    
-    html += """                    </tr>
+$year_headers                    </tr>
                 </thead>
                 <tbody>
-"""
-    
-    # Asset class rows
-    for ac_name, vals in ac_returns.items():
-        html += f'                    <tr class="ac-row">\n                        <td><strong>{ac_name}</strong></td>\n'
-        for val in vals:
-            css_class = 'positive' if val >= 0 else 'negative'
-            html += f'                        <td class="{css_class}">{val:+.2f}%</td>\n'
-        html += '                    </tr>\n'
-    
-    # Portfolio rows
-    for i, (port_name, vals) in enumerate(port_returns.items()):
-        html += f'                    <tr class="port-row hidden" data-port="{i}">\n                        <td><strong>{port_name}</strong></td>\n'
-        for val in vals:
-            css_class = 'positive' if val >= 0 else 'negative'
-            html += f'                        <td class="{css_class}">{val:+.2f}%</td>\n'
-        html += '                    </tr>\n'
-    
-    html += """                </tbody>
+$table_rows                </tbody>
             </table>
         </div>
         
@@ -267,47 +146,7 @@ def main():
         <div id="chartView" class="view-content">
             <div class="chart-scroll">
                 <div class="chart-grid">
-"""
-    
-    # Generate bar chart - simpler approach
-    for year_idx, year in enumerate(year_labels):
-        html += '                    <div class="year-group">\n'
-        html += '                        <div class="chart-area">\n'
-        html += '                            <div class="baseline"></div>\n'
-        html += '                            <div class="bars">\n'
-        
-        # Asset class bars
-        for ac_name, vals in ac_returns.items():
-            val = vals[year_idx]
-            height_pct = (abs(val) / y_max) * 100
-            color = colors[ac_name]
-            bar_class = 'positive' if val >= 0 else 'negative'
-            
-            html += f'                                <div class="bar ac-bar" data-group="{ac_name}">\n'
-            html += f'                                    <div class="bar-rect {bar_class}" style="--bar-color: {color}; height: {height_pct}%;">\n'
-            html += f'                                        <div class="bar-label {bar_class}">{val:.1f}%</div>\n'
-            html += '                                    </div>\n'
-            html += '                                </div>\n'
-        
-        # Portfolio bars
-        for port_idx, (port_name, vals) in enumerate(port_returns.items()):
-            val = vals[year_idx]
-            height_pct = (abs(val) / y_max) * 100
-            color = colors[port_name]
-            bar_class = 'positive' if val >= 0 else 'negative'
-            
-            html += f'                                <div class="bar port-bar hidden" data-port="{port_idx}" data-group="{port_name}">\n'
-            html += f'                                    <div class="bar-rect {bar_class}" style="--bar-color: {color}; height: {height_pct}%;">\n'
-            html += f'                                        <div class="bar-label {bar_class}">{val:.1f}%</div>\n'
-            html += '                                    </div>\n'
-            html += '                                </div>\n'
-        
-        html += '                            </div>\n'
-        html += '                        </div>\n'
-        html += f'                        <div class="year-label">{year}</div>\n'
-        html += '                    </div>\n'
-    
-    html += """                </div>
+$bar_grid                </div>
             </div>
             
             <div class="legend">
@@ -354,7 +193,7 @@ def main():
         // Toggle portfolios
         function togglePort(idx) {
             event.target.classList.toggle('active');
-            document.querySelectorAll(`[data-port="${idx}"]`).forEach(el => {
+            document.querySelectorAll(`[data-port="$${idx}"]`).forEach(el => {
                 el.classList.toggle('hidden');
             });
         }
@@ -376,8 +215,212 @@ def main():
         }
     </script>
 </body>
-</html>"""
+</html>""")
+
+def load_prices():
+    """Load the monthly price frame, preferring a Feather sidecar
+
+    The CSV rarely changes between site rebuilds; once parsed, the frame
+    is mirrored to Feather and later runs mmap that copy instead of
+    re-tokenizing text, as long as it is at least as new as the CSV.
+    """
+    if (os.path.exists(PRICES_FEATHER) and
+            os.path.getmtime(PRICES_FEATHER) >= os.path.getmtime(PRICES_CSV)):
+        return pd.read_feather(PRICES_FEATHER).set_index('Date')
+
+    # Arrow's multithreaded reader parses the tz-offset timestamps
+    # straight to UTC, so the separate to_datetime pass goes away; drop
+    # the zone to keep the naive index the rest of the script expects
+    table = pacsv.read_csv(PRICES_CSV)
+    prices = table.to_pandas(self_destruct=True).set_index('Date')
+    # A CSV written from a tz-naive frame parses to a naive index, which
+    # tz_convert would reject - only drop the zone when there is one
+    if prices.index.tz is not None:
+        prices.index = prices.index.tz_convert(None)
+    prices.reset_index().to_feather(PRICES_FEATHER)
+    return prices
+
+def main():
+    print("=" * 70)
+    print("ANNUAL RETURNS CHART WITH TABS")
+    print("=" * 70)
+    
+    # Load data
+    print("\nLoading data...")
+    prices = load_prices()
+    
+    # orjson parses the nested allocation dicts in native code
+    with open('portfolio_calculations_monthly.json', 'rb') as f:
+        portfolios = orjson.loads(f.read())
+    
+    print(f"✓ Data loaded successfully")
+    
+    # Asset classes
+    asset_classes = {
+        'Cash': ['BIL'],
+        'Fixed Income': ['SHY', 'IGSB', 'IGIB', 'LQD', 'SHYG', 'HYG', 'EMB', 'CEMB'],
+        'Equity': ['SPY', 'QQQ', 'IJK', 'IWM', 'VGK', 'EWU', 'EWJ', 'EEM', 'AAXJ', 'MCHI', 'INDA'],
+        'Alternative Investments': ['GLD', 'FTLS', 'QAI', 'WTMF']
+    }
+    
+    colors = {
+        'Cash': '#90EE90',
+        'Fixed Income': '#4169E1',
+        'Equity': '#FF6B6B',
+        'Alternative Investments': '#FFD700',
+        'Conservative Income': '#505050',
+        'Conservative Balanced': '#707070',
+        'Balanced Portfolio': '#909090',
+        'Growth Portfolio': '#A8A8A8',
+        'Aggressive Growth Portfolio': '#C0C0C0'
+    }
     
+    # Calculate returns
+    print("Calculating returns...")
+    years_idx = prices.index.year
+    years = [y for y in sorted(years_idx.unique()) if y >= 2015]
+    latest_year = max(years)
+
+    # One grouped first/last reduction over every column replaces the
+    # per-year boolean mask + iloc re-scan: the (years x etfs) ratio
+    # table below is sliced per asset class instead of recomputed
+    by_year = prices.groupby(years_idx)
+    grouped = by_year.agg(['first', 'last'])
+    year_counts = by_year.size()
+    ratios = (grouped.xs('last', axis=1, level=1) /
+              grouped.xs('first', axis=1, level=1) - 1)
+    # Years with a single observation carry no return, as before
+    full_years = [y for y in years if year_counts.loc[y] >= 2]
+
+    # Asset class returns (set membership instead of an Index scan per ETF)
+    cols = set(prices.columns)
+    ac_returns = {}
+    for ac_name, etf_list in asset_classes.items():
+        valid_etfs = [e for e in etf_list if e in cols]
+        if not valid_etfs:
+            continue
+
+        rets = ratios[valid_etfs].mean(axis=1) * 100
+        returns = [round(rets.loc[y], 2) for y in full_years]
+
+        # YTD
+        if year_counts.loc[latest_year] >= 2:
+            returns.append(round(rets.loc[latest_year], 2))
+
+        ac_returns[ac_name] = returns
+    
+    # Portfolio returns: weight each ETF's yearly last/first return from
+    # the same ratio table - one matrix-vector product per portfolio.
+    # (The old per-year sum of monthly pct_change values was not a
+    # compound return; first/last matches the asset-class calculation.)
+    ret_mat = ratios.loc[full_years].fillna(0).to_numpy()
+    ytd_ok = year_counts.loc[latest_year] >= 2
+    port_returns = {}
+    for port_name, port_data in portfolios.items():
+        allocations = port_data['allocations']
+        weights = np.array([allocations.get(etf, 0.0) for etf in ratios.columns])
+        port_rets = ret_mat @ weights * 100
+        returns = [round(r, 2) for r in port_rets]
+
+        # YTD
+        if ytd_ok:
+            returns.append(round(port_rets[-1], 2))
+
+        port_returns[port_name] = returns
+    
+    year_labels = [str(y) for y in years] + ['YTD']
+    
+    # Find min/max for chart scaling; bar geometry for the chart view is
+    # computed here in whole (series x years) arrays instead of one
+    # abs/divide and sign test per bar inside the year loop
+    ac_arr = np.array(list(ac_returns.values()))
+    port_arr = np.array(list(port_returns.values()))
+    y_max = max(np.abs(ac_arr).max(), np.abs(port_arr).max())  # Make symmetric
+    ac_heights = np.abs(ac_arr) / y_max * 100
+    ac_signs = np.where(ac_arr >= 0, 'positive', 'negative')
+    port_heights = np.abs(port_arr) / y_max * 100
+    port_signs = np.where(port_arr >= 0, 'positive', 'negative')
+    
+    print("✓ Returns calculated")
+    print("Generating HTML with tabs...")
+    
+    # Generate the dynamic fragments; the static document shell is the
+    # module-level _PAGE_SHELL template, substituted once below
+    buttons = ''.join(
+        f'                    <button onclick="togglePort({i})">{name}</button>\n'
+        for i, name in enumerate(port_returns))
+
+    year_headers = ''.join(f'                        <th>{year}</th>\n'
+                           for year in year_labels)
+
+    # Each row goes out as one string: the cells are a single join over
+    # the values rather than an append per cell
+    def table_cells(vals):
+        return ''.join(
+            f'                        <td class="{"positive" if val >= 0 else "negative"}">{val:+.2f}%</td>\n'
+            for val in vals)
+
+    rows = []
+    # Asset class rows
+    for ac_name, vals in ac_returns.items():
+        rows.append(f'                    <tr class="ac-row">\n'
+                    f'                        <td><strong>{ac_name}</strong></td>\n'
+                    f'{table_cells(vals)}                    </tr>\n')
+
+    # Portfolio rows
+    for i, (port_name, vals) in enumerate(port_returns.items()):
+        rows.append(f'                    <tr class="port-row hidden" data-port="{i}">\n'
+                    f'                        <td><strong>{port_name}</strong></td>\n'
+                    f'{table_cells(vals)}                    </tr>\n')
+
+    # Group name, color and the hidden/port attributes never vary across
+    # years: bake them into one template per series so the year loop only
+    # fills sign, height and value
+    ac_bar_tmpl = {
+        ac: ('                                <div class="bar ac-bar" data-group="' + ac + '">\n'
+             '                                    <div class="bar-rect {sign}" style="--bar-color: ' + colors[ac] + '; height: {h}%;">\n'
+             '                                        <div class="bar-label {sign}">{v:.1f}%</div>\n'
+             '                                    </div>\n'
+             '                                </div>\n')
+        for ac in ac_returns}
+    port_bar_tmpl = {
+        port: ('                                <div class="bar port-bar hidden" data-port="' + str(i) + '" data-group="' + port + '">\n'
+               '                                    <div class="bar-rect {sign}" style="--bar-color: ' + colors[port] + '; height: {h}%;">\n'
+               '                                        <div class="bar-label {sign}">{v:.1f}%</div>\n'
+               '                                    </div>\n'
+               '                                </div>\n')
+        for i, port in enumerate(port_returns)}
+
+    year_group_tmpl = ('                    <div class="year-group">\n'
+                       '                        <div class="chart-area">\n'
+                       '                            <div class="baseline"></div>\n'
+                       '                            <div class="bars">\n'
+                       '{bars}'
+                       '                            </div>\n'
+                       '                        </div>\n'
+                       '                        <div class="year-label">{year}</div>\n'
+                       '                    </div>\n')
+
+    # Format every bar up front from the precomputed arrays, then emit
+    # each year group as one templated string instead of ~10 appends of
+    # scaffolding plus several per bar
+    ac_bars = [[ac_bar_tmpl[name].format(sign=ac_signs[i, y], h=ac_heights[i, y], v=ac_arr[i, y])
+                for y in range(len(year_labels))]
+               for i, name in enumerate(ac_returns)]
+    port_bars = [[port_bar_tmpl[name].format(sign=port_signs[i, y], h=port_heights[i, y], v=port_arr[i, y])
+                  for y in range(len(year_labels))]
+                 for i, name in enumerate(port_returns)]
+
+    bar_grid = ''.join(
+        year_group_tmpl.format(
+            bars=(''.join(series[year_idx] for series in ac_bars) +
+                  ''.join(series[year_idx] for series in port_bars)),
+            year=year)
+        for year_idx, year in enumerate(year_labels))
+
+    html = _PAGE_SHELL.substitute(buttons=buttons, year_headers=year_headers,
+                                  table_rows=''.join(rows), bar_grid=bar_grid)
+
     with open('annual_returns_chart.html', 'w', encoding='utf-8') as f:
         f.write(html)
     